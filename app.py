@@ -2,33 +2,72 @@ import streamlit as st
 import sys
 import os
 import io
-import tempfile
+import random
 from pathlib import Path
 
-# Add sudoku_generators to Python path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'sudoku_generators'))
+# Make the sudoku_generators package importable when run from elsewhere
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-# Import sudoku generators (using importlib for dynamic imports due to filename issues)
-import importlib.util
+from sudoku_generators import puzzle_id, registry
+from sudoku_generators.bank import PuzzleBank
+from sudoku_generators.pdf_cache import PdfCache
+from sudoku_generators.pool import PuzzlePool
+from sudoku_generators.session_cache import CacheBudget, SessionCache
 
-def load_module_from_path(module_name, file_path):
-    spec = importlib.util.spec_from_file_location(module_name, file_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
+# Pre-generated puzzles (python -m sudoku_generators.bank build puzzle_bank.bin);
+# when the file exists "Gerar" is served from it instead of generating live
+BANK_PATH = os.environ.get("SUDOKU_BANK", "puzzle_bank.bin")
+SUDOKU_KINDS = {
+    "Clássico 9x9": "9x9",
+    "Clássico 12x12": "12x12",
+    "Clássico 16x16": "16x16",
+    "Cross Sudoku": "cross",
+    "Samurai Sudoku": "samurai",
+}
 
-# Load modules dynamically
-sudoku_9x9_module = load_module_from_path("sudoku_9x9", "sudoku_generators/classic/9x9_sudoku.py")
-sudoku_12x12_module = load_module_from_path("sudoku_12x12", "sudoku_generators/classic/12x12_sudoku.py")
-sudoku_16x16_module = load_module_from_path("sudoku_16x16", "sudoku_generators/classic/16x16_sudoku.py")
-cross_sudoku_module = load_module_from_path("cross_sudoku", "sudoku_generators/special/cross_sudoku.py")
-samurai_sudoku_module = load_module_from_path("samurai_sudoku", "sudoku_generators/special/samurai_sudoku.py")
+@st.cache_resource
+def generator_module(kind):
+    # Loaded on the first run of each server process, not on every rerun
+    return registry.load_module(kind)
 
-Sudoku9x9 = sudoku_9x9_module.SudokuGenerator
-Sudoku12x12 = sudoku_12x12_module.SudokuGenerator
-Sudoku16x16 = sudoku_16x16_module.SudokuGenerator
-CrossSudokuGenerator = cross_sudoku_module.CrossSudokuGenerator
-SamuraiSudokuGenerator = samurai_sudoku_module.SamuraiSudokuGenerator
+@st.cache_resource
+def open_bank(path):
+    # One read-only mapping per server process, shared by all sessions
+    return PuzzleBank(path)
+
+# Kinds kept warm in memory by a background producer process
+# (comma-separated registry kinds; empty disables the pool)
+POOL_KINDS = tuple(kind for kind in os.environ.get("SUDOKU_POOL", "16x16,samurai").split(",")
+                   if kind)
+
+@st.cache_resource
+def puzzle_pool(kinds):
+    # Started once per server process and shared by all sessions
+    return PuzzlePool(kinds).start()
+
+# Generated puzzles and PDFs are kept per session, keyed by
+# (type, difficulty, count, seed), so reruns and repeat downloads reuse them
+SESSION_CACHE_BYTES = int(os.environ.get("SUDOKU_SESSION_CACHE_MB", "16")) * 1024 * 1024
+TOTAL_CACHE_BYTES = int(os.environ.get("SUDOKU_CACHE_MB", "256")) * 1024 * 1024
+
+@st.cache_resource
+def cache_budget():
+    # Bounds the session caches of all sessions of this server process
+    return CacheBudget(TOTAL_CACHE_BYTES)
+
+# Rendered PDFs on disk, shared by every session and worker process (and by
+# python -m sudoku_generators.book --cache); repeated downloads are a file read
+PDF_CACHE_DIR = os.environ.get("SUDOKU_PDF_CACHE", ".pdf_cache")
+PDF_CACHE_BYTES = int(os.environ.get("SUDOKU_PDF_CACHE_MB", "512")) * 1024 * 1024
+
+@st.cache_resource
+def pdf_cache():
+    return PdfCache(PDF_CACHE_DIR, PDF_CACHE_BYTES)
+
+def session_cache():
+    if "results" not in st.session_state:
+        st.session_state["results"] = SessionCache(cache_budget(), SESSION_CACHE_BYTES)
+    return st.session_state["results"]
 
     # Configure page
 st.set_page_config(
@@ -145,34 +184,12 @@ st.markdown("""
 # Display function removed - no preview needed
 
 def create_pdf_download(puzzles, sudoku_type, difficulty):
-    """Create PDF for download"""
-    import tempfile
-    
+    """Create PDF for download, as bytes (from the PDF cache or rendered in memory)"""
     try:
-        if sudoku_type == "Clássico 9x9":
-            # Use the loaded module
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                filename = tmp_file.name
-                sudoku_9x9_module.create_pdf_with_sudoku(puzzles, difficulty, 1, filename)
-                return filename
-        
-        elif sudoku_type == "Clássico 12x12":
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                filename = tmp_file.name
-                sudoku_12x12_module.create_pdf_with_sudoku(puzzles, difficulty, 1, filename)
-                return filename
-        
-        elif sudoku_type == "Cross Sudoku":
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                filename = tmp_file.name
-                cross_sudoku_module.create_pdf_with_cross_sudoku(puzzles, difficulty, filename)
-                return filename
-        
-        elif sudoku_type == "Samurai Sudoku":
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                filename = tmp_file.name
-                samurai_sudoku_module.create_pdf_with_samurai_sudoku(puzzles, difficulty, filename)
-                return filename
+        sudoku_kind = SUDOKU_KINDS.get(sudoku_type)
+        if sudoku_kind in registry.PDF_RENDERERS:
+            generator_module(sudoku_kind)
+            return pdf_cache().render(sudoku_kind, puzzles, difficulty, 1)
         
     except Exception as e:
         print(f"Error creating PDF: {e}")
@@ -180,7 +197,29 @@ def create_pdf_download(puzzles, sudoku_type, difficulty):
     
     return None
 
+def show_result(key, entry):
+    # Download button without container
+    sudoku_type, difficulty, num_puzzles, seed = key
+    pdf_data, ids = entry["pdf"], entry["ids"]
+    if pdf_data:
+        st.download_button(
+            label="Baixar PDF",
+            data=pdf_data,
+            file_name=f"{sudoku_type.lower().replace(' ', '_')}_{difficulty}_{num_puzzles}puzzles.pdf",
+            mime="application/pdf",
+            use_container_width=True
+        )
+    else:
+        st.warning("PDF não disponível para este tipo de sudoku")
+    if entry["seeded"]:
+        st.caption(f"Semente: {seed}")
+    if ids:
+        # python -m sudoku_generators.puzzle_id <id> --solution prints a puzzle and its solution again
+        st.caption("Códigos dos puzzles: " + " ".join(puzzle_id.format_id(i) for i in ids))
+
 def main():
+    pool = puzzle_pool(POOL_KINDS) if POOL_KINDS else None
+    
     # Header
     st.markdown('<h1 class="main-header">Gerador de Sudoku</h1>', unsafe_allow_html=True)
     
@@ -219,59 +258,80 @@ def main():
         generate_button = st.button("Gerar", use_container_width=True)
     
     # Main content area
+    cache = session_cache()
+    sudoku_kind = SUDOKU_KINDS.get(sudoku_type)
+    bank = open_bank(BANK_PATH) if os.path.exists(BANK_PATH) else None
+    from_bank = bank is not None and bank.count(sudoku_kind, difficulty)
+    # Pooled puzzles come from the background producer, whatever the seed
+    pooled = not from_bank and pool is not None and pool.has(sudoku_kind, difficulty)
+    
+    seed_text = ""
+    if not pooled:
+        # The same seed and settings give the same puzzles again, from the
+        # session cache when they were generated in this session
+        seed_text = st.text_input("Semente (opcional)", placeholder="Semente (opcional)",
+                                  label_visibility="collapsed").strip()
+    
+    entry = None
     if generate_button:
+        seed = int(seed_text) if seed_text.isdigit() else random.getrandbits(63)
+        key = (sudoku_type, difficulty, num_puzzles, seed)
+        # Looked up once: another session can evict the entry at any time
+        entry = cache.get(key)
+    
+    if entry is not None:
+        st.session_state["current"] = key
+        show_result(key, entry)
+    
+    elif generate_button:
         with st.spinner("Gerando sudoku..."):
             try:
                 puzzles = []
+                ids = None
                 
-                if sudoku_type == "Clássico 9x9":
-                    generator = Sudoku9x9()
-                    for i in range(num_puzzles):
-                        puzzle = generator.generate_puzzle(difficulty)
-                        puzzles.append(puzzle)
+                if from_bank:
+                    # Pre-generated puzzles, nothing to generate
+                    puzzles = bank.sample(sudoku_kind, difficulty, num_puzzles, random.Random(seed))
                 
-                elif sudoku_type == "Clássico 12x12":
-                    generator = Sudoku12x12()
-                    for i in range(num_puzzles):
-                        puzzle = generator.generate_puzzle(difficulty)
-                        puzzles.append(puzzle)
+                elif pooled:
+                    # Ready puzzles; the pool refills in the background
+                    puzzles = pool.take(sudoku_kind, difficulty, num_puzzles)
                 
-                elif sudoku_type == "Cross Sudoku":
-                    generator = CrossSudokuGenerator()
-                    for i in range(num_puzzles):
-                        puzzle_dict = generator.generate_cross_puzzle(difficulty)
-                        puzzles.append(puzzle_dict)
+                elif sudoku_kind is not None:
+                    generator_module(sudoku_kind)
+                    generator = registry.make_generator(sudoku_kind)
+                    # Each puzzle from its own ID, so it can be generated again
+                    ids = puzzle_id.batch_ids(sudoku_kind, num_puzzles, difficulty, seed)
+                    for i in ids:
+                        puzzles.append(puzzle_id.regenerate(i, generator=generator))
                 
-                elif sudoku_type == "Samurai Sudoku":
-                    generator = SamuraiSudokuGenerator()
-                    for i in range(num_puzzles):
-                        center, outers = generator.generate_samurai_puzzles(difficulty)
-                        puzzles.append((center, outers))
-                
-                # Download button without container
+                pdf_data = None
                 if puzzles:
                     try:
-                        pdf_file = create_pdf_download(puzzles, sudoku_type, difficulty)
-                        if pdf_file:
-                            with open(pdf_file, "rb") as file:
-                                st.download_button(
-                                    label="Baixar PDF",
-                                    data=file.read(),
-                                    file_name=f"{sudoku_type.lower().replace(' ', '_')}_{difficulty}_{num_puzzles}puzzles.pdf",
-                                    mime="application/pdf",
-                                    use_container_width=True
-                                )
+                        pdf_data = create_pdf_download(puzzles, sudoku_type, difficulty)
                     except Exception as e:
-                        st.warning("PDF não disponível para este tipo de sudoku")
+                        pdf_data = None
+                
+                entry = {"pdf": pdf_data, "ids": ids, "seeded": not pooled}
+                cache.put(key, entry)
+                st.session_state["current"] = key
+                show_result(key, entry)
                 st.success(f"{num_puzzles} puzzle(s) gerado(s) com sucesso! Use o botão acima para fazer o download do PDF.")
                 
             except Exception as e:
                 st.error(f"Erro ao gerar sudoku: {str(e)}")
     
     else:
-        # Welcome message
-        st.markdown("### Bem-vindo!")
-        st.markdown("Selecione o tipo de sudoku, dificuldade e quantidade, depois clique em **Gerar**.")
+        # Rerun after "Gerar" (e.g. the download): show the cached result,
+        # unless it has been evicted since
+        key = st.session_state.get("current")
+        entry = cache.get(key) if key is not None else None
+        if entry is not None:
+            show_result(key, entry)
+        else:
+            # Welcome message
+            st.markdown("### Bem-vindo!")
+            st.markdown("Selecione o tipo de sudoku, dificuldade e quantidade, depois clique em **Gerar**.")
     
     # Footer
     st.markdown("---")
@@ -0,0 +1,174 @@
+"""Pre-generated puzzle bank read through ``mmap``.
+
+File layout::
+
+    magic (8 bytes) | index length (4 bytes, little endian) | JSON index | records
+
+The index lists one section per (kind, difficulty) with its record size,
+record count and the offset of its first record from the end of the
+index. A record holds, for every grid of the puzzle in ``batch`` template
+order, the clues followed by the solution, one byte per cell. The file is
+mapped read-only, so lookups slice the mapping without reading the file,
+and every process that opens the bank (e.g. each Streamlit worker) shares
+the same pages through the page cache.
+"""
+import argparse
+import json
+import mmap
+import os
+import random
+import struct
+import time
+
+from sudoku_generators import parallel, registry
+from sudoku_generators.batch import PuzzleBatch, rebuild
+from sudoku_generators.puzzle import Puzzle
+from sudoku_generators.rating import component_grids
+
+MAGIC = b"SDKBANK1"
+HEADER = struct.Struct("<8sI")
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+def _record(puzzle, solution):
+    record = bytearray()
+    for grid, solved in zip(component_grids(puzzle), component_grids(solution)):
+        for row in grid:
+            record.extend(row)
+        for row in solved:
+            record.extend(row)
+    return record
+
+
+def write_bank(path, sections):
+    """Write ``sections``, a dict of (kind, difficulty) -> [(puzzle, solution)].
+
+    The file is written next to ``path`` and moved into place, so readers
+    never see a half-written bank.
+    """
+    index = []
+    body = bytearray()
+    for (kind, difficulty), pairs in sections.items():
+        size, template = registry.LAYOUTS[kind]
+        record_size = 2 * PuzzleBatch(size, template).record_size
+        index.append({"kind": kind, "difficulty": difficulty, "size": size,
+                      "record_size": record_size, "count": len(pairs), "offset": len(body)})
+        for puzzle, solution in pairs:
+            body.extend(_record(puzzle, solution))
+
+    index_bytes = json.dumps({"sections": index}).encode()
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as handle:
+        handle.write(HEADER.pack(MAGIC, len(index_bytes)))
+        handle.write(index_bytes)
+        handle.write(body)
+    os.replace(tmp_path, path)
+
+
+def build(path, kinds, count, difficulties=DIFFICULTIES, seed=None, workers=None):
+    # Generate count puzzles with solutions for every kind and difficulty
+    if seed is None:
+        seed = random.getrandbits(63)
+    sections = {}
+    for kind in kinds:
+        for difficulty in difficulties:
+            section_seed = parallel.task_seed(seed, f"{kind}:{difficulty}")
+            sections[(kind, difficulty)] = parallel.generate(
+                kind, count, difficulty, section_seed, workers, solutions=True)
+    write_bank(path, sections)
+
+
+class PuzzleBank:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a puzzle bank")
+        index = json.loads(self._map[HEADER.size:HEADER.size + index_length])
+        self._records_start = HEADER.size + index_length
+        self.sections = {(section["kind"], section["difficulty"]): section
+                         for section in index["sections"]}
+
+    def count(self, kind, difficulty):
+        section = self.sections.get((kind, difficulty.lower()))
+        return section["count"] if section else 0
+
+    def record(self, kind, difficulty, index):
+        # Raw record bytes, a view into the mapping
+        section = self.sections[(kind, difficulty.lower())]
+        if not 0 <= index < section["count"]:
+            raise IndexError("puzzle index out of range")
+        start = self._records_start + section["offset"] + index * section["record_size"]
+        return memoryview(self._map)[start:start + section["record_size"]]
+
+    def get(self, kind, difficulty, index):
+        """Puzzle ``index`` of a section, with its solution attached.
+
+        Returned in the structure the kind's generator returns, with
+        ``Puzzle`` objects for the grids.
+        """
+        size, template = registry.LAYOUTS[kind]
+        record = self.record(kind, difficulty, index)
+        step = 2 * size * size
+        try:
+            grids = (Puzzle(size, record[start:start + step])
+                     for start in range(0, len(record), step))
+            return rebuild(template, grids)
+        finally:
+            record.release()
+
+    def sample(self, kind, difficulty, n, rng=random):
+        # n different puzzles while the section has enough, else repeats
+        total = self.count(kind, difficulty)
+        if not total:
+            raise KeyError(f"No {difficulty} {kind} puzzles in {self.path}")
+        if n <= total:
+            indexes = rng.sample(range(total), n)
+        else:
+            indexes = [rng.randrange(total) for _ in range(n)]
+        return [self.get(kind, difficulty, index) for index in indexes]
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect a puzzle bank")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build")
+    build_parser.add_argument("path")
+    build_parser.add_argument("--kinds", default=",".join(registry.GENERATORS))
+    build_parser.add_argument("--difficulties", default=",".join(DIFFICULTIES))
+    build_parser.add_argument("--count", type=int, default=100)
+    build_parser.add_argument("--seed", type=int)
+    build_parser.add_argument("--workers", type=int)
+    info_parser = commands.add_parser("info")
+    info_parser.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        build(args.path, args.kinds.split(","), args.count, args.difficulties.split(","),
+              args.seed, args.workers)
+        print(f"Bank written to {args.path} in {time.perf_counter() - start:.1f}s")
+
+    with PuzzleBank(args.path) as bank:
+        for (kind, difficulty), section in sorted(bank.sections.items()):
+            print(f"{kind:>14} {difficulty:>6}: {section['count']} puzzles, "
+                  f"{section['record_size']} bytes each")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Compact container for many generated puzzles.
+
+Every puzzle is stored as one fixed-size record in a single ``bytearray``
+(one byte per cell, grids back to back) instead of as nested lists, and is
+rebuilt into the structure its generator returns only when it is read.
+"""
+from sudoku_generators.rating import component_grids
+
+# Templates of the generator results: GRID marks where a grid goes
+GRID = 0
+SINGLE = GRID
+CROSS = {"center": GRID, "top": GRID, "bottom": GRID, "left": GRID, "right": GRID}
+SAMURAI = (GRID, {"top_left": GRID, "top_right": GRID,
+                  "bottom_left": GRID, "bottom_right": GRID})
+SOHEI = {"top": GRID, "right": GRID, "left": GRID, "bottom": GRID}
+LINKED = (GRID, GRID)
+
+
+def _count_grids(template):
+    if template == GRID:
+        return 1
+    parts = template.values() if isinstance(template, dict) else template
+    return sum(_count_grids(part) for part in parts)
+
+
+def rebuild(template, grids):
+    # Consume grids from the iterator in the order component_grids yields them
+    if template == GRID:
+        return next(grids)
+    if isinstance(template, dict):
+        return {key: rebuild(part, grids) for key, part in template.items()}
+    parts = [rebuild(part, grids) for part in template]
+    return tuple(parts) if isinstance(template, tuple) else parts
+
+
+class PuzzleBatch:
+    """Puzzles of one shape packed as fixed-size byte records.
+
+    ``template`` describes what one puzzle looks like (``SINGLE``, ``CROSS``,
+    ``SAMURAI``, ...); indexing or iterating returns that structure with
+    fresh lists, so callers written for ``generate_puzzle`` results work
+    unchanged.
+    """
+
+    def __init__(self, size, template=SINGLE, data=None):
+        self.size = size
+        self.template = template
+        self.grids_per_puzzle = _count_grids(template)
+        self.grid_size = size * size
+        self.record_size = self.grid_size * self.grids_per_puzzle
+        self.data = bytearray() if data is None else data
+
+    def __len__(self):
+        return len(self.data) // self.record_size
+
+    def append(self, puzzle):
+        data = self.data
+        for grid in component_grids(puzzle):
+            for row in grid:
+                data.extend(row)
+
+    def write(self, index, puzzle):
+        # Store a puzzle in place, for buffers sized up front
+        record = bytearray()
+        for grid in component_grids(puzzle):
+            for row in grid:
+                record.extend(row)
+        offset = index * self.record_size
+        self.data[offset:offset + self.record_size] = record
+
+    def record(self, index):
+        # Raw bytes of one puzzle, without copying
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("puzzle index out of range")
+        start = index * self.record_size
+        return memoryview(self.data)[start:start + self.record_size]
+
+    def grids(self, index):
+        record = self.record(index)
+        size = self.size
+        for start in range(0, self.record_size, self.grid_size):
+            yield [list(record[start + i * size:start + (i + 1) * size]) for i in range(size)]
+
+    def __getitem__(self, index):
+        return rebuild(self.template, self.grids(index))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def nbytes(self):
+        return len(self.data)
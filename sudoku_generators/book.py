@@ -0,0 +1,291 @@
+"""PDF books of any length, written while the puzzles are produced.
+
+``write_book`` takes the puzzles as any iterable (a generator, a bank
+sample, a ``PuzzleBatch``) and renders them a few pages at a time with the
+kind's own ``create_pdf_*`` function, optionally on several processes. ``BookWriter`` copies the pages of
+each rendered part into one output PDF as soon as they are ready, keeping
+a single copy of resources the parts share (fonts, etc.). Neither the
+puzzles nor the pages of earlier parts stay in memory; what grows with the
+book is the cross-reference table, 8 bytes per PDF object.
+"""
+import argparse
+import hashlib
+import os
+import random
+import re
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from sudoku_generators import registry
+from sudoku_generators.parallel import task_seed
+from sudoku_generators.pdf_cache import PdfCache, pdf_key
+
+# Pages rendered by reportlab in one go before they are copied out
+DEFAULT_CHUNK_PAGES = 50
+
+# The variant renderers have a fixed layout of two puzzles per page
+VARIANT_PUZZLES_PER_PAGE = 2
+
+_REFERENCE = re.compile(rb"(\d+) 0 R")
+_TYPE = re.compile(rb"/Type /(\w+)")
+
+
+def _read_objects(data):
+    # Object number -> (dictionary, stream or None), and the number of the
+    # catalog, for a PDF with one plain xref table (as reportlab writes)
+    xref = int(data[data.rindex(b"startxref") + 9:].split()[0])
+    lines = data[xref:].split(b"\n")
+    count = int(lines[1].split()[1])
+    offsets = {number: int(line[:10]) for number, line in enumerate(lines[2:2 + count])
+               if number and line[17:18] == b"n"}
+    ends = sorted(offsets.values()) + [xref]
+    next_offset = dict(zip(ends, ends[1:]))
+
+    objects = {}
+    for number, start in offsets.items():
+        body = data[start:next_offset[start]]
+        body = body[body.index(b"obj") + 3:body.rindex(b"endobj")].lstrip()
+        head, separator, stream = body.partition(b"stream\n")
+        objects[number] = (head, stream if separator else None)
+
+    root = int(re.search(rb"/Root (\d+) 0 R", data[xref:]).group(1))
+    return objects, root
+
+
+def _object_type(head):
+    match = _TYPE.search(head)
+    return match.group(1) if match else None
+
+
+class BookWriter:
+    """Append the pages of whole PDFs to one output PDF, written as it goes.
+
+    ``output`` is a path or a binary file object. Objects are copied with
+    new numbers; fonts, form XObjects and other non-page objects that are
+    byte for byte identical after renumbering are written only once.
+    """
+
+    def __init__(self, output, title=None):
+        if isinstance(output, (str, os.PathLike)):
+            self._file = open(output, "wb")
+            self._owns_file = True
+        else:
+            self._file = output
+            self._owns_file = False
+        self.title = title
+        self.pages = 0
+        self.shared_objects = 0
+        self._position = 0
+        # Offsets of objects 1.. (1 is the catalog, 2 the page tree root)
+        self._offsets = array("Q", [0, 0])
+        self._page_nodes = array("Q")
+        self._shared = {}
+        self._write(b"%PDF-1.4\n%\x93\x8c\x8b\x9e\n")
+
+    def _write(self, data):
+        self._file.write(data)
+        self._position += len(data)
+
+    def _new_number(self):
+        self._offsets.append(0)
+        return len(self._offsets)
+
+    def _write_object(self, number, head, stream=None):
+        self._offsets[number - 1] = self._position
+        self._write(b"%d 0 obj\n" % number)
+        self._write(head)
+        if stream is not None:
+            self._write(b"stream\n")
+            self._write(stream)
+        self._write(b"endobj\n")
+
+    def append(self, data):
+        """Copy every page of the PDF ``data`` (bytes) to the end of the book."""
+        objects, root = _read_objects(data)
+        page_tree = int(re.search(rb"/Pages (\d+) 0 R", objects[root][0]).group(1))
+        node = self._new_number()
+        numbers = {page_tree: node}
+
+        def copy(old):
+            new = numbers.get(old)
+            if new is not None:
+                return new
+            head, stream = objects[old]
+            head = _REFERENCE.sub(lambda match: b"%d 0 R" % copy(int(match.group(1))), head)
+            object_type = _object_type(head)
+            if object_type == b"Page" or (stream is not None and b"/Subtype /Form" not in head):
+                # Page contents are never shared; keep them out of the index
+                new = self._new_number()
+                self._write_object(new, head, stream)
+            else:
+                key = hashlib.blake2b(head + (stream or b""), digest_size=16).digest()
+                new = self._shared.get(key)
+                if new is None:
+                    new = self._shared[key] = self._new_number()
+                    self._write_object(new, head, stream)
+                else:
+                    self.shared_objects += 1
+            numbers[old] = new
+            return new
+
+        kids = [copy(page) for page in self._page_order(objects, page_tree)]
+        self._write_object(node, b"<<\n/Type /Pages /Parent 2 0 R /Kids [ %s ] /Count %d\n>>\n"
+                           % (b" ".join(b"%d 0 R" % kid for kid in kids), len(kids)))
+        self._page_nodes.append(node)
+        self.pages += len(kids)
+        return len(kids)
+
+    def _page_order(self, objects, node):
+        head = objects[node][0]
+        if _object_type(head) != b"Pages":
+            yield node
+            return
+        kids = re.search(rb"/Kids \[([^\]]*)\]", head).group(1)
+        for kid in _REFERENCE.findall(kids):
+            yield from self._page_order(objects, int(kid))
+
+    def close(self):
+        if self._file is None:
+            return
+        kids = b" ".join(b"%d 0 R" % node for node in self._page_nodes)
+        self._write_object(2, b"<<\n/Type /Pages /Kids [ %s ] /Count %d\n>>\n" % (kids, self.pages))
+        self._write_object(1, b"<<\n/Type /Catalog /Pages 2 0 R /PageMode /UseNone\n>>\n")
+        info = self._new_number()
+        title = (self.title or "untitled").replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        self._write_object(info, b"<<\n/Producer (sudoku_generators.book) /Title (%s)\n>>\n"
+                           % title.encode("latin-1", "replace"))
+
+        xref = self._position
+        self._write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(self._offsets) + 1))
+        for start in range(0, len(self._offsets), 1024):
+            self._write(b"".join(b"%010d 00000 n \n" % offset
+                                 for offset in self._offsets[start:start + 1024]))
+        self._write(b"trailer\n<<\n/Size %d /Root 1 0 R /Info %d 0 R\n>>\nstartxref\n%d\n%%%%EOF\n"
+                    % (len(self._offsets) + 1, info, xref))
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def puzzles_per_page(kind, requested=1):
+    # Classic renderers take puzzles_per_page, the variants have a fixed layout
+    return requested if registry.PDF_RENDERERS[kind][1] else VARIANT_PUZZLES_PER_PAGE
+
+
+def _parts(puzzles, size):
+    # (number of the first puzzle, puzzles) for whole pages of the book
+    puzzles = iter(puzzles)
+    first = 1
+    while True:
+        part = list(islice(puzzles, size))
+        if not part:
+            return
+        yield first, part
+        first += len(part)
+
+
+def render_part(kind, puzzles, difficulty, per_page, first_number):
+    # Runs in a worker process when rendering in parallel
+    return registry.render_pdf_bytes(kind, puzzles, difficulty, per_page, first_number)
+
+
+def write_book(kind, puzzles, difficulty, output, per_page=1, chunk_pages=DEFAULT_CHUNK_PAGES,
+               title=None, workers=1, cache=None):
+    """Write ``puzzles`` (any iterable) as one PDF book; returns the puzzle count.
+
+    The pages are the ones ``registry.render_pdf`` draws for the whole list,
+    titles numbered across the book, but rendered ``chunk_pages`` pages at
+    a time. With ``workers`` > 1 the parts are rendered in that many
+    processes (at most two parts per worker in flight) and joined in book
+    order; fonts and grid forms end up in the book once. With a
+    ``pdf_cache.PdfCache`` parts rendered before are read from it.
+    """
+    parts = _parts(puzzles, puzzles_per_page(kind, per_page) * chunk_pages)
+    count = 0
+    with BookWriter(output, title) as writer:
+        if workers <= 1:
+            for first, part in parts:
+                if cache is not None:
+                    writer.append(cache.render(kind, part, difficulty, per_page, first))
+                else:
+                    writer.append(render_part(kind, part, difficulty, per_page, first))
+                count += len(part)
+            return count
+
+        def deliver(key, result):
+            if isinstance(result, bytes):
+                writer.append(result)
+                return
+            data = result.result()
+            if cache is not None:
+                cache.put(key, data)
+            writer.append(data)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for first, part in parts:
+                key = data = None
+                if cache is not None:
+                    key = pdf_key(kind, part, difficulty, per_page, first)
+                    data = cache.get(key)
+                if data is None:
+                    data = pool.submit(render_part, kind, part, difficulty, per_page, first)
+                pending.append((key, data))
+                count += len(part)
+                if len(pending) >= 2 * workers:
+                    deliver(*pending.popleft())
+            while pending:
+                deliver(*pending.popleft())
+    return count
+
+
+def generate_puzzles(kind, count, difficulty="medium", seed=None):
+    # One puzzle at a time, the same ones parallel.generate returns for seed
+    if seed is None:
+        seed = random.getrandbits(63)
+    generator = registry.make_generator(kind)
+    for index in range(count):
+        generator.rng = random.Random(task_seed(seed, index))
+        yield registry.generate_one(generator, kind, difficulty)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a PDF book of generated puzzles")
+    parser.add_argument("kind", choices=sorted(registry.GENERATORS))
+    parser.add_argument("count", type=int)
+    parser.add_argument("output")
+    parser.add_argument("--difficulty", default="medium")
+    parser.add_argument("--per-page", type=int, default=1)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--chunk-pages", type=int, default=DEFAULT_CHUNK_PAGES)
+    parser.add_argument("--workers", type=int, default=1, help="processes rendering pages")
+    parser.add_argument("--cache", help="PDF cache directory shared with the app")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    cache = PdfCache(args.cache) if args.cache else None
+    puzzles = generate_puzzles(args.kind, args.count, args.difficulty, args.seed)
+    count = write_book(args.kind, puzzles, args.difficulty, args.output, args.per_page,
+                       args.chunk_pages, f"{args.difficulty.title()} {args.kind} Sudoku",
+                       args.workers, cache)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {count} {args.kind} puzzles to {args.output} in {elapsed:.1f}s")
+    if cache is not None:
+        stats = cache.stats()
+        print(f"PDF cache: {stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['evictions']} evictions")
+
+
+if __name__ == "__main__":
+    main()
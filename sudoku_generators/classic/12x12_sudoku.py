@@ -1,11 +1,36 @@
+import os
 import random
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
+import sys
+
+# Make the shared sudoku_generators package importable when run as a script
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from sudoku_generators import dlx, pdf_grids, sampling, search
+from sudoku_generators.constraints import CandidateGrid
+from sudoku_generators.digging import dig_unique
 
 class SudokuGenerator:
-    def __init__(self):
+    # Set difficulty level (more cells to remove for 12x12)
+    DIFFICULTY_LEVELS = {
+        "easy": 60,
+        "medium": 80,
+        "hard": 100
+    }
+    
+    def __init__(self, fill_mode="mrv", seed=None, rng=None):
         self.grid = [[0]*12 for _ in range(12)]
+        # Use 4x3 boxes for 12x12 sudoku (4 cols, 3 rows)
+        self.constraints = CandidateGrid(12, 3, 4)
+        self.fill_mode = fill_mode
+        # Every random choice goes through self.rng; pass a random.Random
+        # or a seed to make the puzzles repeatable
+        if rng is None:
+            rng = random.Random(seed) if seed is not None else random
+        self.rng = rng
+        # Complete grid behind the last puzzle returned
+        self.solution = None
     
     def is_valid(self, row, col, num):
         for x in range(12):
@@ -21,34 +46,42 @@ class SudokuGenerator:
         return True
     
     def fill_grid(self):
-        for i in range(12):
-            for j in range(12):
-                if self.grid[i][j] == 0:
-                    numbers = list(range(1, 13))
-                    random.shuffle(numbers)
-                    for num in numbers:
-                        if self.is_valid(i, j, num):
-                            self.grid[i][j] = num
-                            if self.fill_grid():
-                                return True
-                            self.grid[i][j] = 0
-                    return False
-        return True
+        # "mrv" branches on the most constrained cell, "row_major" is the
+        # classic reading-order backtracking, "iterative" is the same
+        # search without recursion, "transform" reshuffles a cached
+        # solution instead of searching and "dlx" uses Dancing Links
+        return search.fill(self.grid, self.constraints, self.fill_mode, self.rng)
     
-    def generate_puzzle(self, difficulty="medium"):
+    def band_candidate(self, difficulty, remove_count, deadline=None):
+        # Fresh solution dug uniquely toward the rating band of difficulty
         self.grid = [[0]*12 for _ in range(12)]
         self.fill_grid()
+        return sampling.dig_to_band(self.grid, remove_count, difficulty, 3, 4, self.rng,
+                                    deadline)
+    
+    def generate_puzzle(self, difficulty="medium", unique=False, deadline=None):
+        remove_count = self.DIFFICULTY_LEVELS.get(difficulty.lower(), 80)
+        
+        if deadline is not None:
+            # Rate candidates until one lands in the difficulty band or
+            # time.monotonic() passes the deadline; returns (puzzle, rating)
+            puzzle, puzzle_rating = sampling.sample(
+                lambda until: self.band_candidate(difficulty, remove_count, until), 12, difficulty, deadline)
+            # Candidates are dug uniquely, so solving recovers the solution
+            self.solution = dlx.solve(puzzle, 3, 4)
+            return puzzle, puzzle_rating
+        
+        self.grid = [[0]*12 for _ in range(12)]
+        self.fill_grid()
+        self.solution = [row[:] for row in self.grid]
         
-        # Set difficulty level (more cells to remove for 12x12)
-        difficulty_levels = {
-            "easy": 60,
-            "medium": 80,
-            "hard": 100
-        }
-        remove_count = difficulty_levels.get(difficulty.lower(), 80)
+        if unique:
+            # Only blank cells that keep the solution unique
+            self.grid, _ = dig_unique(self.grid, remove_count, 3, 4, self.rng)
+            return [row[:] for row in self.grid]
         
         cells = [(i, j) for i in range(12) for j in range(12)]
-        random.shuffle(cells)
+        self.rng.shuffle(cells)
         
         for _ in range(remove_count):
             if cells:
@@ -57,7 +90,11 @@ class SudokuGenerator:
         
         return [row[:] for row in self.grid]
 
-def create_pdf_with_sudoku(puzzles, difficulty, puzzles_per_page, filename):
+def create_pdf_with_sudoku(puzzles, difficulty, puzzles_per_page, filename, first_number=1):
+    # first_number: number in the title of the first puzzle (for books in parts)
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    
     c = canvas.Canvas(filename, pagesize=letter)
     width, height = letter
     
@@ -107,35 +144,23 @@ def create_pdf_with_sudoku(puzzles, difficulty, puzzles_per_page, filename):
             c.setFont("Helvetica-Bold", 16)
             title = f"{difficulty.title()} 12x12 Sudoku Puzzles"
             if puzzles_per_page > 1:
-                start_puzzle = puzzle_count + 1
-                end_puzzle = min(puzzle_count + puzzles_per_page, len(puzzles))
+                start_puzzle = first_number + puzzle_count
+                end_puzzle = first_number - 1 + min(puzzle_count + puzzles_per_page, len(puzzles))
                 title += f" #{start_puzzle}-{end_puzzle}"
             else:
-                title += f" #{puzzle_num + 1}"
+                title += f" #{first_number + puzzle_num}"
             c.drawString(50, height - 50, title)
         
         start_x, start_y = positions[page_position]
         
-        # Draw grid (12x12 with 3x3 boxes)
-        for i in range(13):
-            line_width = 2 if i % 3 == 0 else 1
-            c.setLineWidth(line_width)
-            # Horizontal lines
-            c.line(start_x, start_y - i * cell_size,
-                   start_x + 12 * cell_size, start_y - i * cell_size)
+        # Draw grid (12x12 with 3x4 boxes; one form per document)
+        pdf_grids.grid(c, start_x, start_y, 12, 3, 4, cell_size)
         
-        for j in range(13):
-            line_width = 2 if j % 4 == 0 else 1
-            c.setLineWidth(line_width)
-            # Vertical lines
-            c.line(start_x + j * cell_size, start_y,
-                   start_x + j * cell_size, start_y - 12 * cell_size)
-        
-        # Fill numbers
+        # Fill numbers (one text object per grid)
         font_size = max(6, min(12, cell_size - 2))
-        c.setFont("Helvetica", font_size)
         offset = font_size / 3
         
+        clues = []
         for i in range(12):
             for j in range(12):
                 if puzzle[i][j] != 0:
@@ -146,7 +171,8 @@ def create_pdf_with_sudoku(puzzles, difficulty, puzzles_per_page, filename):
                     else:
                         x = start_x + j * cell_size + cell_size/2 - offset
                     y = start_y - i * cell_size - cell_size/2 - offset
-                    c.drawString(x, y, text)
+                    clues.append((x, y, text))
+        pdf_grids.draw_clues(c, "Helvetica", font_size, clues)
         
         puzzle_count += 1
     
@@ -159,6 +185,9 @@ def main():
     # CHANGE NUMBER OF PUZZLES TO GENERATE
     NUM_PUZZLES = 8
     
+    # CHANGE NUMBER OF WORKER PROCESSES (1 = one after another here)
+    WORKERS = 1
+    
     # CHANGE PUZZLES PER PAGE (max 4)
     PUZZLES_PER_PAGE = min(4, max(1, 4))  # Change the middle number (1-4)
     
@@ -166,10 +195,14 @@ def main():
     puzzles = []
     
     print(f"Generating {NUM_PUZZLES} {DIFFICULTY} Sudoku puzzles...")
-    for i in range(NUM_PUZZLES):
-        puzzle = generator.generate_puzzle(DIFFICULTY)
-        puzzles.append(puzzle)
-        print(f"Puzzle {i+1} generated")
+    if WORKERS > 1:
+        from sudoku_generators import parallel
+        puzzles = parallel.generate("12x12", NUM_PUZZLES, DIFFICULTY, workers=WORKERS)
+    else:
+        for i in range(NUM_PUZZLES):
+            puzzle = generator.generate_puzzle(DIFFICULTY)
+            puzzles.append(puzzle)
+            print(f"Puzzle {i+1} generated")
     
     filename = f"{DIFFICULTY}_12x12_sudoku_puzzles.pdf"
     create_pdf_with_sudoku(puzzles, DIFFICULTY, PUZZLES_PER_PAGE, filename)
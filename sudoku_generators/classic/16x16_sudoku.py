@@ -1,12 +1,37 @@
+import os
 import random
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
+import sys
+
+# Make the shared sudoku_generators package importable when run as a script
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from sudoku_generators import dlx, pdf_grids, sampling, search
+from sudoku_generators.constraints import CandidateGrid
+from sudoku_generators.digging import dig_unique
 
 class SudokuGenerator:
-    def __init__(self):
+    # Numbers to remove for each difficulty
+    DIFFICULTY_LEVELS = {
+        "easy": 80,
+        "medium": 110,
+        "hard": 140
+    }
+    
+    def __init__(self, fill_mode="mrv", seed=None, rng=None):
         self.size = 16
         self.grid = [[0]*self.size for _ in range(self.size)]
+        # Row, column and 4x4 box occupancy masks
+        self.constraints = CandidateGrid(self.size, 4, 4)
+        self.fill_mode = fill_mode
+        # Every random choice goes through self.rng; pass a random.Random
+        # or a seed to make the puzzles repeatable
+        if rng is None:
+            rng = random.Random(seed) if seed is not None else random
+        self.rng = rng
+        # Complete grid behind the last puzzle returned
+        self.solution = None
     
     def is_valid(self, row, col, num):
         # Check row
@@ -28,21 +53,31 @@ class SudokuGenerator:
         return True
     
     def fill_grid(self):
-        for i in range(self.size):
-            for j in range(self.size):
-                if self.grid[i][j] == 0:
-                    numbers = list(range(1, self.size + 1))
-                    random.shuffle(numbers)
-                    for num in numbers:
-                        if self.is_valid(i, j, num):
-                            self.grid[i][j] = num
-                            if self.fill_grid():
-                                return True
-                            self.grid[i][j] = 0
-                    return False
-        return True
+        # "mrv" branches on the most constrained cell, "row_major" is the
+        # classic reading-order backtracking, "iterative" is the same
+        # search without recursion, "transform" reshuffles a cached
+        # solution instead of searching and "dlx" uses Dancing Links
+        return search.fill(self.grid, self.constraints, self.fill_mode, self.rng)
+    
+    def band_candidate(self, difficulty, remove_count, deadline=None):
+        # Fresh solution dug uniquely toward the rating band of difficulty
+        self.grid = [[0]*self.size for _ in range(self.size)]
+        self.fill_grid()
+        return sampling.dig_to_band(self.grid, remove_count, difficulty, 4, 4, self.rng,
+                                    deadline)
     
-    def generate_puzzle(self, difficulty="medium"):
+    def generate_puzzle(self, difficulty="medium", unique=False, deadline=None):
+        remove_count = self.DIFFICULTY_LEVELS.get(difficulty.lower(), 110)
+        
+        if deadline is not None:
+            # Rate candidates until one lands in the difficulty band or
+            # time.monotonic() passes the deadline; returns (puzzle, rating)
+            puzzle, puzzle_rating = sampling.sample(
+                lambda until: self.band_candidate(difficulty, remove_count, until), self.size, difficulty, deadline)
+            # Candidates are dug uniquely, so solving recovers the solution
+            self.solution = dlx.solve(puzzle, 4, 4)
+            return puzzle, puzzle_rating
+        
         print(f"Generating {self.size}x{self.size} Sudoku puzzle...")
         
         # Reset grid
@@ -54,29 +89,29 @@ class SudokuGenerator:
             return [[0]*self.size for _ in range(self.size)]
         
         print(f"Successfully generated {self.size}x{self.size} complete grid")
-        
-        # Remove numbers for difficulty
-        difficulty_levels = {
-            "easy": 80,
-            "medium": 110, 
-            "hard": 140
-        }
-        remove_count = difficulty_levels.get(difficulty.lower(), 110)
-        
-        cells = [(i, j) for i in range(self.size) for j in range(self.size)]
-        random.shuffle(cells)
-        
-        removed = 0
-        for row, col in cells:
-            if removed >= remove_count:
-                break
-            self.grid[row][col] = 0
-            removed += 1
+        self.solution = [row[:] for row in self.grid]
+        
+        if unique:
+            # Only blank cells that keep the solution unique
+            self.grid, removed = dig_unique(self.grid, remove_count, 4, 4, self.rng)
+        else:
+            cells = [(i, j) for i in range(self.size) for j in range(self.size)]
+            self.rng.shuffle(cells)
+            
+            removed = 0
+            for row, col in cells:
+                if removed >= remove_count:
+                    break
+                self.grid[row][col] = 0
+                removed += 1
         
         print(f"Removed {removed} numbers. Final grid size: {len(self.grid)}x{len(self.grid[0])}")
         return [row[:] for row in self.grid]
 
 def create_pdf_with_sudoku(puzzles, difficulty, puzzles_per_page, filename):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    
     c = canvas.Canvas(filename, pagesize=letter)
     width, height = letter
     
@@ -130,32 +165,23 @@ def create_pdf_with_sudoku(puzzles, difficulty, puzzles_per_page, filename):
             print(f"ERROR: Puzzle has wrong dimensions: {len(puzzle)}x{len(puzzle[0]) if puzzle else 0}")
             continue
         
-        # Draw 16x16 grid
-        for i in range(SIZE + 1):
-            line_width = 2 if i % 4 == 0 else 1
-            c.setLineWidth(line_width)
-            c.line(start_x, start_y - i * cell_size,
-                   start_x + SIZE * cell_size, start_y - i * cell_size)
-        
-        for j in range(SIZE + 1):
-            line_width = 2 if j % 4 == 0 else 1
-            c.setLineWidth(line_width)
-            c.line(start_x + j * cell_size, start_y,
-                   start_x + j * cell_size, start_y - SIZE * cell_size)
+        # Draw 16x16 grid (one form per document, placed by reference)
+        pdf_grids.grid(c, start_x, start_y, SIZE, 4, 4, cell_size)
         
-        # Fill numbers
+        # Fill numbers (one text object per grid)
         font_size = max(6, min(10, cell_size - 2))
-        c.setFont("Helvetica", font_size)
         
+        clues = []
         for i in range(SIZE):
             for j in range(SIZE):
                 if puzzle[i][j] != 0:
                     text = str(puzzle[i][j])
                     # Center text in cell
-                    text_width = c.stringWidth(text)
+                    text_width = pdf_grids.text_width(c, text, "Helvetica", font_size)
                     x = start_x + j * cell_size + (cell_size - text_width) / 2
                     y = start_y - i * cell_size - cell_size/2 - font_size/3
-                    c.drawString(x, y, text)
+                    clues.append((x, y, text))
+        pdf_grids.draw_clues(c, "Helvetica", font_size, clues)
         
         puzzle_count += 1
     
@@ -168,6 +194,9 @@ def main():
     # CHANGE NUMBER OF PUZZLES TO GENERATE  
     NUM_PUZZLES = 2  # Start with 1 for testing
     
+    # CHANGE NUMBER OF WORKER PROCESSES (1 = one after another here)
+    WORKERS = 1
+    
     # CHANGE PUZZLES PER PAGE (max 4)
     PUZZLES_PER_PAGE = 2
     
@@ -175,10 +204,14 @@ def main():
     puzzles = []
     
     print(f"Generating {NUM_PUZZLES} {DIFFICULTY} 16x16 Sudoku puzzles...")
-    for i in range(NUM_PUZZLES):
-        puzzle = generator.generate_puzzle(DIFFICULTY)
-        puzzles.append(puzzle)
-        print(f"Generated puzzle {i+1}: {len(puzzle)}x{len(puzzle[0]) if puzzle else 0}")
+    if WORKERS > 1:
+        from sudoku_generators import parallel
+        puzzles = parallel.generate("16x16", NUM_PUZZLES, DIFFICULTY, workers=WORKERS)
+    else:
+        for i in range(NUM_PUZZLES):
+            puzzle = generator.generate_puzzle(DIFFICULTY)
+            puzzles.append(puzzle)
+            print(f"Generated puzzle {i+1}: {len(puzzle)}x{len(puzzle[0]) if puzzle else 0}")
     
     filename = f"{DIFFICULTY}_16x16_sudoku_puzzles.pdf"
     create_pdf_with_sudoku(puzzles, DIFFICULTY, PUZZLES_PER_PAGE, filename)
@@ -1 +1,12 @@
 # Classic Sudoku Generators
+# The module files start with a digit, so they are importable under the
+# aliases sudoku_9x9, sudoku_12x12 and sudoku_16x16 (sudoku_9x9.py etc.);
+# the aliases also work as attributes of this package
+_ALIASES = {"sudoku_9x9": "9x9", "sudoku_12x12": "12x12", "sudoku_16x16": "16x16"}
+
+
+def __getattr__(name):
+    if name in _ALIASES:
+        from sudoku_generators import registry
+        return registry.load_module(_ALIASES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
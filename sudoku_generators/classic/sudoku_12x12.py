@@ -0,0 +1,8 @@
+# Importable name for 12x12_sudoku.py: stands in for the module the registry
+# loads from that file, so every import path gets the same module
+import sys
+
+from sudoku_generators import registry
+
+del sys.modules[__name__]
+sys.modules[__name__] = registry.load_module("12x12")
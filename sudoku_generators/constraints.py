@@ -0,0 +1,103 @@
+"""Bitmask constraint core shared by every generator.
+
+Row, column and box occupancy are kept as integer bitmasks (bit ``num - 1``
+set means ``num`` is already used) and updated incrementally as cells are
+placed or cleared, so checking a candidate is O(1) instead of a rescan of
+the row, column and box.
+"""
+
+_POPCOUNT_TABLES = {}
+
+
+def popcount_table(size):
+    # One entry per possible candidate mask; shared by every grid of this size
+    table = _POPCOUNT_TABLES.get(size)
+    if table is None:
+        table = [0] * (1 << size)
+        for mask in range(1, 1 << size):
+            table[mask] = table[mask >> 1] + (mask & 1)
+        _POPCOUNT_TABLES[size] = table
+    return table
+
+
+_DIGIT_TABLES = {}
+
+
+def digits_table(size):
+    # Digits of each candidate mask, filled in lazily as masks come up
+    table = _DIGIT_TABLES.get(size)
+    if table is None:
+        table = _DIGIT_TABLES[size] = [None] * (1 << size)
+    return table
+
+
+def mask_digits(table, mask):
+    digits = table[mask]
+    if digits is None:
+        digits = table[mask] = tuple(num for num in range(1, len(table).bit_length())
+                                     if (mask >> (num - 1)) & 1)
+    return digits
+
+
+class CandidateGrid:
+    def __init__(self, size=9, box_rows=3, box_cols=3):
+        self.size = size
+        self.box_rows = box_rows
+        self.box_cols = box_cols
+        self.full_mask = (1 << size) - 1
+        self.popcount = popcount_table(size)
+        self.digits = digits_table(size)
+        self.boxes_per_row = size // box_cols
+
+        # Box index of every cell, looked up instead of recomputed
+        self.box_of = [[(row // box_rows) * self.boxes_per_row + col // box_cols
+                        for col in range(size)] for row in range(size)]
+        # Row, column and box of every flat cell index (row * size + col),
+        # shared by the fillers so they need not rebuild them per grid
+        cells = range(size * size)
+        self.cell_row = [cell // size for cell in cells]
+        self.cell_col = [cell % size for cell in cells]
+        self.cell_box = [self.box_of[cell // size][cell % size] for cell in cells]
+
+        self.rows = [0] * size
+        self.cols = [0] * size
+        self.boxes = [0] * size
+
+    def reset(self):
+        for i in range(self.size):
+            self.rows[i] = 0
+            self.cols[i] = 0
+            self.boxes[i] = 0
+
+    def load(self, grid):
+        # Rebuild the masks from a (possibly partially filled) grid
+        self.reset()
+        for row in range(self.size):
+            for col in range(self.size):
+                num = grid[row][col]
+                if num:
+                    self.place(row, col, num)
+
+    def place(self, row, col, num):
+        bit = 1 << (num - 1)
+        self.rows[row] |= bit
+        self.cols[col] |= bit
+        self.boxes[self.box_of[row][col]] |= bit
+
+    def remove(self, row, col, num):
+        bit = ~(1 << (num - 1))
+        self.rows[row] &= bit
+        self.cols[col] &= bit
+        self.boxes[self.box_of[row][col]] &= bit
+
+    def allows(self, row, col, num):
+        used = self.rows[row] | self.cols[col] | self.boxes[self.box_of[row][col]]
+        return not (used >> (num - 1)) & 1
+
+    def candidate_mask(self, row, col):
+        used = self.rows[row] | self.cols[col] | self.boxes[self.box_of[row][col]]
+        return ~used & self.full_mask
+
+    def candidates(self, row, col):
+        mask = self.candidate_mask(row, col)
+        return [num for num in range(1, self.size + 1) if (mask >> (num - 1)) & 1]
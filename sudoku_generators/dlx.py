@@ -0,0 +1,275 @@
+"""Algorithm X with Dancing Links, set up for sudoku grids.
+
+A grid of size N with boxes of ``box_rows`` x ``box_cols`` is modelled as
+an exact-cover matrix with one row per (row, col, digit) placement and
+4 * N * N columns: every cell holds one digit, and every row, column and
+box holds every digit once. The links live in flat integer lists and the
+matrix for a box shape is built once and reused; clues are applied by
+covering their placements before the search and uncovered afterwards.
+"""
+import random
+
+# Box shape (rows, cols) used by each supported grid size
+BOX_SHAPES = {
+    9: (3, 3),
+    12: (3, 4),
+    16: (4, 4),
+}
+
+
+class SudokuExactCover:
+    def __init__(self, size=9, box_rows=3, box_cols=3):
+        self.size = size
+        self.box_rows = box_rows
+        self.box_cols = box_cols
+
+        cells = size * size
+        column_count = 4 * cells
+        boxes_per_row = size // box_cols
+
+        # Node 0 is the root, nodes 1..column_count are the column headers
+        self.L = list(range(-1, column_count))
+        self.R = list(range(1, column_count + 2))
+        self.L[0] = column_count
+        self.R[column_count] = 0
+        self.U = list(range(column_count + 1))
+        self.D = list(range(column_count + 1))
+        self.C = list(range(column_count + 1))
+        self.S = [0] * (column_count + 1)
+        self.placement_of = [None] * (column_count + 1)
+
+        # First node of the matrix row for each placement, indexed by
+        # (row * size + col) * size + digit - 1
+        self.row_start = []
+        for row in range(size):
+            for col in range(size):
+                box = (row // box_rows) * boxes_per_row + col // box_cols
+                for digit in range(size):
+                    columns = (
+                        1 + row * size + col,
+                        1 + cells + row * size + digit,
+                        1 + 2 * cells + col * size + digit,
+                        1 + 3 * cells + box * size + digit,
+                    )
+                    self.row_start.append(self._add_row(columns, (row, col, digit + 1)))
+
+    def _add_row(self, columns, placement):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        first = len(C)
+        for offset, column in enumerate(columns):
+            node = first + offset
+            L.append(node - 1 if offset else first + len(columns) - 1)
+            R.append(node + 1 if offset < len(columns) - 1 else first)
+            U.append(U[column])
+            D.append(column)
+            D[U[column]] = node
+            U[column] = node
+            C.append(column)
+            S[column] += 1
+            self.placement_of.append(placement)
+        return first
+
+    def _cover(self, column):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        L[R[column]] = L[column]
+        R[L[column]] = R[column]
+        i = D[column]
+        while i != column:
+            j = R[i]
+            while j != i:
+                U[D[j]] = U[j]
+                D[U[j]] = D[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def _uncover(self, column):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[column]
+        while i != column:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                U[D[j]] = j
+                D[U[j]] = j
+                j = L[j]
+            i = U[i]
+        L[R[column]] = column
+        R[L[column]] = column
+
+    def _select_row(self, node):
+        # Cover every column of the matrix row that ``node`` belongs to
+        j = self.R[node]
+        while j != node:
+            self._cover(self.C[j])
+            j = self.R[j]
+
+    def _deselect_row(self, node):
+        j = self.L[node]
+        while j != node:
+            self._uncover(self.C[j])
+            j = self.L[j]
+
+    def _apply_clues(self, grid):
+        # Returns the list of covered clue rows, or None if clues clash
+        size = self.size
+        R, C = self.R, self.C
+        applied = []
+        header_active = set()
+        column = R[0]
+        while column != 0:
+            header_active.add(column)
+            column = R[column]
+        for row in range(size):
+            for col in range(size):
+                num = grid[row][col]
+                if not num:
+                    continue
+                node = self.row_start[(row * size + col) * size + num - 1]
+                columns = [C[node + offset] for offset in range(4)]
+                if any(column not in header_active for column in columns):
+                    self._remove_clues(applied)
+                    return None
+                for column in columns:
+                    self._cover(column)
+                    header_active.discard(column)
+                applied.append(node)
+        return applied
+
+    def _remove_clues(self, applied):
+        for node in reversed(applied):
+            for offset in range(3, -1, -1):
+                self._uncover(self.C[node + offset])
+
+    def _search(self, limit, rng, on_solution):
+        """Run Algorithm X, returning the number of solutions found.
+
+        Stops once ``limit`` solutions were seen. When ``rng`` is given the
+        rows of each chosen column are tried in random order.
+        """
+        R, D, C, S = self.R, self.D, self.C, self.S
+        chosen = []
+        found = [0]
+
+        def recurse():
+            if R[0] == 0:
+                found[0] += 1
+                if on_solution is not None:
+                    on_solution(chosen)
+                return found[0] >= limit
+
+            # Column with the fewest remaining rows
+            column = R[0]
+            best = column
+            best_size = S[column]
+            while column != 0 and best_size > 1:
+                if S[column] < best_size:
+                    best, best_size = column, S[column]
+                column = R[column]
+            if best_size == 0:
+                return False
+
+            rows = []
+            i = D[best]
+            while i != best:
+                rows.append(i)
+                i = D[i]
+            if rng is not None:
+                rng.shuffle(rows)
+
+            self._cover(best)
+            for i in rows:
+                chosen.append(i)
+                self._select_row(i)
+                done = recurse()
+                self._deselect_row(i)
+                chosen.pop()
+                if done:
+                    self._uncover(best)
+                    return True
+            self._uncover(best)
+            return False
+
+        recurse()
+        return found[0]
+
+    def _run(self, grid, limit, rng, on_solution):
+        applied = self._apply_clues(grid)
+        if applied is None:
+            return 0
+        try:
+            return self._search(limit, rng, on_solution)
+        finally:
+            self._remove_clues(applied)
+
+    def _completed(self, grid, chosen):
+        solution = [list(row) for row in grid]
+        for node in chosen:
+            row, col, num = self.placement_of[node]
+            solution[row][col] = num
+        return solution
+
+    def solve(self, grid):
+        result = []
+        self._run(grid, 1, None, lambda chosen: result.append(self._completed(grid, chosen)))
+        return result[0] if result else None
+
+    def random_solution(self, grid, rng=random):
+        result = []
+        self._run(grid, 1, rng, lambda chosen: result.append(self._completed(grid, chosen)))
+        return result[0] if result else None
+
+    def count_solutions(self, grid, limit=2):
+        return self._run(grid, limit, None, None)
+
+    def other_solution(self, grid, row, col, num):
+        """A completion of ``grid`` with a digit other than ``num`` at the
+        blank cell (row, col), or None if there is none.
+
+        For a puzzle whose solution puts ``num`` there this answers
+        ``count_solutions(grid, 2) == 2`` without finding the known
+        solution again.
+        """
+        U, D, C, S = self.U, self.D, self.C, self.S
+        node = self.row_start[(row * self.size + col) * self.size + num - 1]
+        for j in range(node, node + 4):
+            U[D[j]] = U[j]
+            D[U[j]] = D[j]
+            S[C[j]] -= 1
+        try:
+            result = []
+            self._run(grid, 1, None, lambda chosen: result.append(self._completed(grid, chosen)))
+            return result[0] if result else None
+        finally:
+            for j in range(node + 3, node - 1, -1):
+                S[C[j]] += 1
+                U[D[j]] = j
+                D[U[j]] = j
+
+    def has_other_solution(self, grid, row, col, num):
+        return self.other_solution(grid, row, col, num) is not None
+
+
+_SOLVERS = {}
+
+
+def solver_for(size, box_rows=None, box_cols=None):
+    if box_rows is None or box_cols is None:
+        box_rows, box_cols = BOX_SHAPES[size]
+    key = (size, box_rows, box_cols)
+    solver = _SOLVERS.get(key)
+    if solver is None:
+        solver = _SOLVERS[key] = SudokuExactCover(size, box_rows, box_cols)
+    return solver
+
+
+def solve(grid, box_rows=None, box_cols=None):
+    return solver_for(len(grid), box_rows, box_cols).solve(grid)
+
+
+def count_solutions(grid, limit=2, box_rows=None, box_cols=None):
+    return solver_for(len(grid), box_rows, box_cols).count_solutions(grid, limit)
+
+
+def random_solution(grid, rng=random, box_rows=None, box_cols=None):
+    return solver_for(len(grid), box_rows, box_cols).random_solution(grid, rng)
@@ -0,0 +1,57 @@
+"""Fail when loading the generators gets slower than a startup budget.
+
+Each run starts a fresh interpreter, imports the registry and loads every
+generator module, as the first Streamlit run of a server process does.
+The check fails if the fastest run exceeds the budget, or if loading pulled
+in reportlab, which should only be imported once a PDF is rendered.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+DEFAULT_BUDGET_MS = 150
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from sudoku_generators import registry
+for kind in registry.GENERATORS:
+    registry.load_module(kind)
+elapsed = time.perf_counter() - start
+print(json.dumps({"ms": elapsed * 1000, "reportlab": "reportlab" in sys.modules}))
+"""
+
+
+def measure(runs=5):
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT_DIR, check=True,
+                                capture_output=True, text=True).stdout
+        results.append(json.loads(output.splitlines()[-1]))
+    return min(result["ms"] for result in results), any(result["reportlab"] for result in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the generator startup budget")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    elapsed_ms, reportlab_loaded = measure(args.runs)
+    print(f"Loading all generators: {elapsed_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    failed = False
+    if reportlab_loaded:
+        print("FAIL: reportlab was imported while loading the generators")
+        failed = True
+    if elapsed_ms > args.budget_ms:
+        print("FAIL: generator startup is over budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""Puzzle generation spread over a pool of worker processes.
+
+Every puzzle gets its own seed, derived from the batch seed and the
+puzzle's index, and is generated from a fresh ``random.Random(seed)``. The
+output therefore depends only on (kind, difficulty, count, seed), not on
+how many workers there are or how the work is chunked. Fill modes with
+per-process caches ("transform") give up that guarantee.
+
+With ``generate_shared`` workers write finished puzzles as fixed-size byte
+records into one ``multiprocessing.shared_memory`` block instead of
+pickling nested lists back to the parent, which reads them in place.
+"""
+import argparse
+import hashlib
+import os
+import pickle
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from sudoku_generators import registry
+from sudoku_generators.batch import PuzzleBatch
+
+# Puzzles per task sent to a worker; small enough to balance the load,
+# large enough that scheduling overhead stays negligible
+DEFAULT_CHUNK_SIZE = 4
+
+_generators = {}
+
+
+def task_seed(seed, index):
+    # Stable across processes and Python versions, unlike hash(); 56 bits,
+    # so the seed fits in a puzzle ID (see puzzle_id)
+    digest = hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=7).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _generator(kind, kwargs):
+    # One generator per kind and settings in each worker process
+    key = (kind, tuple(sorted(kwargs.items())))
+    generator = _generators.get(key)
+    if generator is None:
+        generator = _generators[key] = registry.make_generator(kind, **kwargs)
+    return generator
+
+
+def generate_chunk(kind, difficulty, seeds, options=None, generator_kwargs=None,
+                   solutions=False):
+    generator = _generator(kind, generator_kwargs or {})
+    puzzles = []
+    for seed in seeds:
+        generator.rng = random.Random(seed)
+        puzzle = registry.generate_one(generator, kind, difficulty, **(options or {}))
+        puzzles.append((puzzle, generator.solution) if solutions else puzzle)
+    return puzzles
+
+
+def generate_chunk_shared(kind, difficulty, first_index, seeds, block_name,
+                          options=None, generator_kwargs=None):
+    # Write the chunk's puzzles into the shared block; returns the seconds
+    # spent generating and writing them
+    generator = _generator(kind, generator_kwargs or {})
+    size, template = registry.LAYOUTS[kind]
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        records = PuzzleBatch(size, template, block.buf)
+        generate_seconds = write_seconds = 0.0
+        for offset, seed in enumerate(seeds):
+            start = time.perf_counter()
+            generator.rng = random.Random(seed)
+            puzzle = registry.generate_one(generator, kind, difficulty, **(options or {}))
+            written = time.perf_counter()
+            records.write(first_index + offset, puzzle)
+            generate_seconds += written - start
+            write_seconds += time.perf_counter() - written
+        del records
+    finally:
+        block.close()
+    return generate_seconds, write_seconds
+
+
+class SharedPuzzleBatch(PuzzleBatch):
+    """PuzzleBatch read straight out of the workers' shared memory block.
+
+    ``stats`` holds the total generation and transfer seconds. Call
+    ``close()`` (or use it as a context manager) to free the block.
+    """
+
+    def __init__(self, block, size, template, count):
+        record_size = PuzzleBatch(size, template).record_size
+        super().__init__(size, template, block.buf[:count * record_size])
+        self.block = block
+        self.stats = {}
+
+    def close(self):
+        if self.block is not None:
+            self.data.release()
+            self.block.close()
+            self.block.unlink()
+            self.block = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _chunks(seed, count, chunk_size):
+    if seed is None:
+        seed = random.getrandbits(63)
+    seeds = [task_seed(seed, index) for index in range(count)]
+    return [(start, seeds[start:start + chunk_size]) for start in range(0, count, chunk_size)]
+
+
+def generate(kind, count, difficulty="medium", seed=None, workers=None,
+             chunk_size=DEFAULT_CHUNK_SIZE, options=None, generator_kwargs=None,
+             solutions=False):
+    """Generate ``count`` puzzles of ``kind`` (see ``registry.GENERATORS``).
+
+    ``workers`` defaults to the number of CPUs; with 1 everything runs in
+    this process. ``options`` are passed to the generating method (e.g.
+    ``{"unique": True}``) and ``generator_kwargs`` to the generator class.
+    Returns the puzzles in index order, as (puzzle, solution) pairs with
+    ``solutions``.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunks = _chunks(seed, count, chunk_size)
+
+    puzzles = []
+    if workers <= 1:
+        for _, chunk in chunks:
+            puzzles.extend(generate_chunk(kind, difficulty, chunk, options, generator_kwargs,
+                                          solutions))
+        return puzzles
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(generate_chunk, kind, difficulty, chunk, options,
+                               generator_kwargs, solutions)
+                   for _, chunk in chunks]
+        for future in futures:
+            puzzles.extend(future.result())
+    return puzzles
+
+
+def generate_shared(kind, count, difficulty="medium", seed=None, workers=None,
+                    chunk_size=DEFAULT_CHUNK_SIZE, options=None, generator_kwargs=None):
+    """Like ``generate``, but results come back through shared memory.
+
+    Returns a ``SharedPuzzleBatch`` with the same puzzles ``generate``
+    returns for these arguments. Its ``stats`` compare the time spent
+    generating with the time spent writing records into the block.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    size, template = registry.LAYOUTS[kind]
+    record_size = PuzzleBatch(size, template).record_size
+    block = shared_memory.SharedMemory(create=True, size=max(1, count * record_size))
+    chunks = _chunks(seed, count, chunk_size)
+
+    try:
+        with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = [pool.submit(generate_chunk_shared, kind, difficulty, start, chunk,
+                                   block.name, options, generator_kwargs)
+                       for start, chunk in chunks]
+            timings = [future.result() for future in futures]
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+
+    batch = SharedPuzzleBatch(block, size, template, count)
+    generate_seconds = sum(timing[0] for timing in timings)
+    transfer_seconds = sum(timing[1] for timing in timings)
+    batch.stats = {
+        "puzzles": count,
+        "generate_seconds": generate_seconds,
+        "transfer_seconds": transfer_seconds,
+        "generate_ms_per_puzzle": 1000 * generate_seconds / max(1, count),
+        "transfer_us_per_puzzle": 1e6 * transfer_seconds / max(1, count),
+    }
+    return batch
+
+
+def pickle_transfer_seconds(puzzles):
+    # What returning these puzzles from a worker costs in pickling alone
+    start = time.perf_counter()
+    pickle.loads(pickle.dumps(puzzles, pickle.HIGHEST_PROTOCOL))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate puzzles on several cores")
+    parser.add_argument("kind", choices=sorted(registry.GENERATORS))
+    parser.add_argument("count", type=int)
+    parser.add_argument("--difficulty", default="medium")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--shared", action="store_true",
+                        help="return results through shared memory")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.shared:
+        with generate_shared(args.kind, args.count, args.difficulty, args.seed,
+                             args.workers, args.chunk_size) as batch:
+            elapsed = time.perf_counter() - start
+            stats = batch.stats
+            print(f"Generated {len(batch)} {args.kind} puzzles in {elapsed:.2f}s "
+                  f"({len(batch) / elapsed:.1f} puzzles/s)")
+            print(f"generation {stats['generate_ms_per_puzzle']:.2f} ms/puzzle, "
+                  f"shared memory transfer {stats['transfer_us_per_puzzle']:.1f} us/puzzle")
+        return
+
+    puzzles = generate(args.kind, args.count, args.difficulty, args.seed,
+                       args.workers, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    transfer = pickle_transfer_seconds(puzzles)
+    print(f"Generated {len(puzzles)} {args.kind} puzzles in {elapsed:.2f}s "
+          f"({len(puzzles) / elapsed:.1f} puzzles/s)")
+    print(f"pickle transfer {1e6 * transfer / max(1, len(puzzles)):.1f} us/puzzle")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Rendered PDFs on disk, addressed by what they show.
+
+The key of a PDF is a hash of the puzzles' cells (lists of lists and
+``Puzzle`` structures of the same content hash the same) and of the layout
+parameters: kind, difficulty, puzzles per page and the number of the
+first puzzle. Files are written to a temporary name and moved into place,
+so readers in other processes never see a partial PDF, and the cache is
+kept under ``max_bytes`` by deleting the least recently used files (a hit
+touches its file). Any number of processes -- Streamlit workers, the book
+CLI -- can share one directory.
+"""
+import hashlib
+import os
+import tempfile
+
+from sudoku_generators import registry
+
+# Bump when the renderers change what they draw, to stop serving old PDFs
+FORMAT = 1
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def _feed(hasher, puzzle):
+    if isinstance(puzzle, dict):
+        for key in sorted(puzzle):
+            hasher.update(key.encode() + b":")
+            _feed(hasher, puzzle[key])
+    elif (len(puzzle) and isinstance(puzzle[0], (list, tuple, bytes, bytearray))
+          and isinstance(puzzle[0][0], int)):
+        # A grid (or a Puzzle, whose rows are bytes)
+        hasher.update(b"%d|" % len(puzzle))
+        for row in puzzle:
+            hasher.update(bytes(row))
+    else:
+        hasher.update(b"[%d|" % len(puzzle))
+        for part in puzzle:
+            _feed(hasher, part)
+
+
+def pdf_key(kind, puzzles, difficulty, per_page=1, first_number=1):
+    hasher = hashlib.blake2b(digest_size=20)
+    hasher.update(f"{FORMAT}|{kind}|{difficulty.lower()}|{per_page}|{first_number}|".encode())
+    _feed(hasher, list(puzzles))
+    return hasher.hexdigest()
+
+
+class PdfCache:
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._nbytes = self._scan_bytes()
+
+    def _path(self, key):
+        # Two-level layout keeps directories small
+        return os.path.join(self.directory, key[:2], key + ".pdf")
+
+    def _files(self):
+        for entry in os.scandir(self.directory):
+            if entry.is_dir():
+                for file in os.scandir(entry.path):
+                    if file.name.endswith(".pdf"):
+                        yield file
+
+    def _scan_bytes(self):
+        return sum(file.stat().st_size for file in self._files())
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as handle:
+                data = handle.read()
+            os.utime(path)
+        except FileNotFoundError:
+            # Never written, or evicted by another process
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A unique temporary name: Streamlit sessions are threads of one process
+        handle, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(path))
+        try:
+            with os.fdopen(handle, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self._nbytes += len(data)
+        if self._nbytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        # Other processes write here too: size up the directory itself
+        files = []
+        for file in self._files():
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, file.path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._nbytes = total
+
+    def render(self, kind, puzzles, difficulty, per_page=1, first_number=1):
+        """PDF bytes of ``registry.render_pdf_bytes``, from the cache if there."""
+        key = pdf_key(kind, puzzles, difficulty, per_page, first_number)
+        data = self.get(key)
+        if data is None:
+            data = registry.render_pdf_bytes(kind, puzzles, difficulty, per_page, first_number)
+            self.put(key, data)
+        return data
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "nbytes": self._nbytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        for file in list(self._files()):
+            try:
+                os.remove(file.path)
+            except FileNotFoundError:
+                pass
+        self._nbytes = 0
@@ -0,0 +1,179 @@
+"""Generation and rendering of a PDF book running at the same time.
+
+Worker processes generate the book in parts of ``chunk_pages`` pages; a
+feeder thread passes finished parts, in order, into a bounded queue, and
+the renderer takes them off the queue and appends their pages to the book
+(see ``book.BookWriter``). With enough workers the total time approaches
+the rendering time alone instead of generation plus rendering.
+
+``write_book`` returns how busy each stage was and how full the queue ran:
+a renderer that often waits on an empty queue wants more workers, a feeder
+that waits on a full queue means the renderer is the bottleneck.
+"""
+import argparse
+import math
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from sudoku_generators import parallel, registry
+from sudoku_generators.book import BookWriter, puzzles_per_page
+
+# Pages per part handed from the workers to the renderer
+DEFAULT_CHUNK_PAGES = 10
+
+# Finished parts waiting for the renderer
+DEFAULT_QUEUE_DEPTH = 4
+
+
+def generate_part(kind, difficulty, seeds):
+    # Runs in a worker; returns the puzzles and the seconds they took
+    start = time.perf_counter()
+    puzzles = parallel.generate_chunk(kind, difficulty, seeds)
+    return puzzles, time.perf_counter() - start
+
+
+def _parts(kind, count, difficulty, seed, size):
+    seeds = [parallel.task_seed(seed, index) for index in range(count)]
+    for start in range(0, count, size):
+        yield start, (kind, difficulty, seeds[start:start + size])
+
+
+class _Feeder(threading.Thread):
+    # Submits parts to the pool, at most in_flight at a time, and puts the
+    # results into the queue in book order
+
+    def __init__(self, pool, parts, output, in_flight):
+        super().__init__(daemon=True)
+        self.pool = pool
+        self.parts = parts
+        self.output = output
+        self.in_flight = in_flight
+        self.stop = threading.Event()
+        self.generate_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    def run(self):
+        pending = deque()
+        try:
+            for start, task in self.parts:
+                pending.append((start, self.pool.submit(generate_part, *task)))
+                if len(pending) >= self.in_flight:
+                    self._deliver(*pending.popleft())
+            while pending:
+                self._deliver(*pending.popleft())
+        except BaseException as error:
+            self._put(error)
+        else:
+            self._put(None)
+
+    def _deliver(self, start, future):
+        puzzles, seconds = future.result()
+        self.generate_seconds += seconds
+        self._put((start, puzzles))
+
+    def _put(self, item):
+        start = time.perf_counter()
+        while not self.stop.is_set():
+            try:
+                self.output.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        self.wait_seconds += time.perf_counter() - start
+
+
+def write_book(kind, count, difficulty, output, per_page=1, seed=None, workers=None,
+               chunk_pages=DEFAULT_CHUNK_PAGES, queue_depth=DEFAULT_QUEUE_DEPTH, title=None):
+    """Generate ``count`` puzzles and write them as a PDF book to ``output``.
+
+    The puzzles are the ones ``parallel.generate`` returns for ``seed``.
+    Returns timing and queue statistics for tuning ``workers``.
+    """
+    if seed is None:
+        seed = random.getrandbits(63)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    part_size = puzzles_per_page(kind, per_page) * chunk_pages
+    parts = queue.Queue(maxsize=queue_depth)
+    depths = []
+    render_seconds = render_wait_seconds = 0.0
+
+    start = time.perf_counter()
+    pool = ProcessPoolExecutor(max_workers=workers)
+    feeder = _Feeder(pool, _parts(kind, count, difficulty, seed, part_size), parts, 2 * workers)
+    try:
+        with BookWriter(output, title) as writer:
+            feeder.start()
+            while True:
+                depths.append(parts.qsize())
+                waited = time.perf_counter()
+                item = parts.get()
+                rendered = time.perf_counter()
+                render_wait_seconds += rendered - waited
+                if item is None:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                first, puzzles = item
+                writer.append(registry.render_pdf_bytes(kind, puzzles, difficulty, per_page,
+                                                        first + 1))
+                render_seconds += time.perf_counter() - rendered
+    finally:
+        feeder.stop.set()
+        feeder.join()
+        pool.shutdown(cancel_futures=True)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "puzzles": count,
+        "pages": writer.pages,
+        "workers": workers,
+        "seconds": elapsed,
+        "generate_seconds": feeder.generate_seconds,
+        "render_seconds": render_seconds,
+        "generate_utilization": feeder.generate_seconds / (workers * elapsed),
+        "render_utilization": render_seconds / elapsed,
+        "render_wait_seconds": render_wait_seconds,
+        "feeder_wait_seconds": feeder.wait_seconds,
+        "queue_depth": queue_depth,
+        "mean_queue_depth": sum(depths) / len(depths),
+        "max_queue_depth": max(depths),
+        # Workers that would generate as fast as one renderer draws
+        "balanced_workers": max(1, math.ceil(feeder.generate_seconds / max(render_seconds, 1e-9))),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate and render a PDF book in parallel")
+    parser.add_argument("kind", choices=sorted(registry.GENERATORS))
+    parser.add_argument("count", type=int)
+    parser.add_argument("output")
+    parser.add_argument("--difficulty", default="medium")
+    parser.add_argument("--per-page", type=int, default=1)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--chunk-pages", type=int, default=DEFAULT_CHUNK_PAGES)
+    parser.add_argument("--queue-depth", type=int, default=DEFAULT_QUEUE_DEPTH)
+    args = parser.parse_args()
+
+    stats = write_book(args.kind, args.count, args.difficulty, args.output, args.per_page,
+                       args.seed, args.workers, args.chunk_pages, args.queue_depth,
+                       f"{args.difficulty.title()} {args.kind} Sudoku")
+    print(f"Wrote {stats['pages']} pages ({stats['puzzles']} {args.kind} puzzles) "
+          f"in {stats['seconds']:.2f}s with {stats['workers']} workers")
+    print(f"generate {stats['generate_seconds']:.2f}s "
+          f"({100 * stats['generate_utilization']:.0f}% of the workers), "
+          f"render {stats['render_seconds']:.2f}s ({100 * stats['render_utilization']:.0f}%)")
+    print(f"queue depth mean {stats['mean_queue_depth']:.1f} / max {stats['max_queue_depth']} "
+          f"of {stats['queue_depth']}; renderer waited {stats['render_wait_seconds']:.2f}s, "
+          f"feeder waited {stats['feeder_wait_seconds']:.2f}s")
+    print(f"workers to keep the renderer busy: {stats['balanced_workers']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Puzzle pools kept warm by a background producer process.
+
+Each (kind, difficulty) pool holds ready puzzles in memory. Whenever a
+pool (counting the puzzles already requested) falls below ``low_water``,
+the producer is asked for enough puzzles to bring it back to
+``high_water``; a collector thread moves finished puzzles into the pools.
+Consumers call ``take()`` and only generate in their own thread (a
+"stall") when the pool they ask for is empty. ``stats()`` reports levels,
+refill rates and stalls per pool.
+"""
+import multiprocessing
+import random
+import threading
+import time
+from collections import Counter, deque
+
+from sudoku_generators import parallel, registry
+from sudoku_generators.puzzle import compact
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+def _produce(requests, results):
+    # Producer process: one puzzle per request until a None arrives
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        kind, difficulty, seed = request
+        puzzle, solution = parallel.generate_chunk(kind, difficulty, [seed], solutions=True)[0]
+        results.put(((kind, difficulty), compact(puzzle, solution)))
+
+
+class PuzzlePool:
+    def __init__(self, kinds, difficulties=DIFFICULTIES, low_water=8, high_water=32,
+                 producers=1, seed=None):
+        self.low_water = low_water
+        self.high_water = high_water
+        self.seed = random.getrandbits(63) if seed is None else seed
+        self.producers = producers
+        self._context = multiprocessing.get_context("spawn")
+        self._requests = self._context.Queue()
+        self._results = self._context.Queue()
+        self._processes = []
+        self._collector = None
+        self._lock = threading.Lock()
+
+        keys = [(kind, difficulty) for kind in kinds for difficulty in difficulties]
+        self._pools = {key: deque() for key in keys}
+        self._in_flight = Counter()
+        self._requested = Counter()
+        self._counters = {key: Counter() for key in keys}
+        self._stall_seconds = Counter()
+        self._started = None
+
+    def start(self):
+        self._started = time.monotonic()
+        for _ in range(self.producers):
+            process = self._context.Process(target=_produce, args=(self._requests, self._results),
+                                            daemon=True)
+            process.start()
+            self._processes.append(process)
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+        for key in self._pools:
+            self._refill(key)
+        return self
+
+    def _collect(self):
+        while True:
+            item = self._results.get()
+            if item is None:
+                break
+            key, puzzle = item
+            with self._lock:
+                self._pools[key].append(puzzle)
+                self._in_flight[key] -= 1
+                self._counters[key]["produced"] += 1
+
+    def _refill(self, key):
+        # Ask the producer to top the pool up once it runs low
+        with self._lock:
+            expected = len(self._pools[key]) + self._in_flight[key]
+            if expected >= self.low_water:
+                return
+            missing = self.high_water - expected
+            self._in_flight[key] += missing
+            first = self._requested[key]
+            self._requested[key] += missing
+        kind, difficulty = key
+        for index in range(first, first + missing):
+            seed = parallel.task_seed(self.seed, f"{kind}:{difficulty}:{index}")
+            self._requests.put((kind, difficulty, seed))
+
+    def has(self, kind, difficulty):
+        return (kind, difficulty.lower()) in self._pools
+
+    def take(self, kind, difficulty, n=1):
+        """Return ``n`` puzzles with solutions, as ``Puzzle`` structures."""
+        key = (kind, difficulty.lower())
+        puzzles = []
+        with self._lock:
+            pool = self._pools[key]
+            while pool and len(puzzles) < n:
+                puzzles.append(pool.popleft())
+            self._counters[key]["taken"] += len(puzzles)
+        missing = n - len(puzzles)
+        if missing:
+            # Pool ran dry: generate the rest here rather than wait, with a
+            # generator of this call's own (Streamlit sessions are threads)
+            start = time.monotonic()
+            generator = registry.make_generator(kind, seed=random.getrandbits(63))
+            for _ in range(missing):
+                puzzle = registry.generate_one(generator, kind, key[1])
+                puzzles.append(compact(puzzle, generator.solution))
+            with self._lock:
+                self._counters[key]["stalls"] += 1
+                self._counters[key]["stalled_puzzles"] += missing
+                self._stall_seconds[key] += time.monotonic() - start
+        self._refill(key)
+        return puzzles
+
+    def stats(self):
+        # Level, in-flight requests, refill rate and stalls of every pool
+        elapsed = max(1e-9, time.monotonic() - (self._started or time.monotonic()))
+        with self._lock:
+            return {
+                key: {
+                    "level": len(pool),
+                    "in_flight": self._in_flight[key],
+                    "produced": self._counters[key]["produced"],
+                    "taken": self._counters[key]["taken"],
+                    "refill_per_second": self._counters[key]["produced"] / elapsed,
+                    "stalls": self._counters[key]["stalls"],
+                    "stalled_puzzles": self._counters[key]["stalled_puzzles"],
+                    "stall_seconds": float(self._stall_seconds[key]),
+                }
+                for key, pool in self._pools.items()
+            }
+
+    def close(self):
+        for _ in self._processes:
+            self._requests.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        if self._collector is not None:
+            self._results.put(None)
+            self._collector.join(timeout=5)
+            self._collector = None
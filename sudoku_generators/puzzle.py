@@ -0,0 +1,129 @@
+"""Compact, immutable puzzle grids.
+
+A ``Puzzle`` keeps its clues (and optionally its solution) in one flat
+``bytes`` object instead of a list of row lists. A 9x9 puzzle drops from
+about 1.3 KB of list objects to about 170 bytes (8x; 11x with its
+solution, 9x and 10.5x for 16x16). Variant results become dicts or tuples
+of one ``Puzzle`` per grid, each with its own header and object overhead,
+so they shrink less: 6.5-7x, or 9.5-10x with solutions.
+
+A ``Puzzle`` reads like a grid -- ``puzzle[i][j]``, ``len(puzzle)``,
+iterating rows -- so the renderers, the rater and the diggers accept it
+wherever they accept a list of lists. It cannot be modified;
+``to_grid()`` returns lists for code that fills or digs in place.
+"""
+from sudoku_generators.dlx import BOX_SHAPES
+
+# Bytes in front of the cells: size, box rows, box columns
+HEADER_SIZE = 3
+
+
+class Puzzle:
+    __slots__ = ("data", "metadata")
+
+    def __init__(self, size, cells, box_rows=None, box_cols=None, metadata=None):
+        # cells is size * size clue bytes, optionally followed by as many
+        # solution bytes; the shape is stored in the same bytes object
+        if len(cells) not in (size * size, 2 * size * size):
+            raise ValueError(f"Expected {size * size} or {2 * size * size} cells, got {len(cells)}")
+        if box_rows is None or box_cols is None:
+            box_rows, box_cols = BOX_SHAPES[size]
+        self.data = bytes((size, box_rows, box_cols)) + bytes(cells)
+        self.metadata = metadata
+
+    @property
+    def size(self):
+        return self.data[0]
+
+    @property
+    def box_rows(self):
+        return self.data[1]
+
+    @property
+    def box_cols(self):
+        return self.data[2]
+
+    @classmethod
+    def from_grid(cls, grid, solution=None, box_rows=None, box_cols=None, metadata=None):
+        data = bytearray()
+        for row in grid:
+            data.extend(row)
+        if solution is not None:
+            for row in solution:
+                data.extend(row)
+        return cls(len(grid), data, box_rows, box_cols, metadata)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, row):
+        size = self.data[0]
+        if row < 0:
+            row += size
+        if not 0 <= row < size:
+            raise IndexError("row index out of range")
+        start = HEADER_SIZE + row * size
+        return self.data[start:start + size]
+
+    def __iter__(self):
+        for row in range(self.size):
+            yield self[row]
+
+    def __eq__(self, other):
+        if not isinstance(other, Puzzle):
+            return NotImplemented
+        return self.data == other.data
+
+    def __hash__(self):
+        return hash(self.data)
+
+    def __repr__(self):
+        return f"Puzzle(size={self.size}, clues={self.clue_count}, solution={self.has_solution})"
+
+    @property
+    def clues(self):
+        return self.data[HEADER_SIZE:HEADER_SIZE + self.size * self.size]
+
+    @property
+    def clue_count(self):
+        return self.size * self.size - self.clues.count(0)
+
+    @property
+    def has_solution(self):
+        return len(self.data) > HEADER_SIZE + self.size * self.size
+
+    @property
+    def solution(self):
+        # The solution as a Puzzle of its own, or None
+        if not self.has_solution:
+            return None
+        return Puzzle(self.size, self.data[HEADER_SIZE + self.size * self.size:],
+                      self.box_rows, self.box_cols)
+
+    def to_grid(self):
+        return [list(row) for row in self]
+
+
+def _is_grid(result):
+    # A list of rows of ints; not a dict, nor a list of dicts or Puzzles
+    return (len(result) and not isinstance(result, dict)
+            and isinstance(result[0], (list, tuple, bytes, bytearray))
+            and len(result[0]) and isinstance(result[0][0], int))
+
+
+def compact(result, solutions=None):
+    """Turn any generator result into the same structure of ``Puzzle``s.
+
+    ``result`` is a grid or the dicts and tuples the variant generators
+    return; ``solutions``, if given, must have the same structure.
+    """
+    if isinstance(result, Puzzle):
+        return result
+    if isinstance(result, dict):
+        return {key: compact(part, solutions[key] if solutions else None)
+                for key, part in result.items()}
+    if _is_grid(result):
+        return Puzzle.from_grid(result, solutions)
+    parts = [compact(part, solutions[index] if solutions else None)
+             for index, part in enumerate(result)]
+    return tuple(parts) if isinstance(result, tuple) else parts
@@ -0,0 +1,110 @@
+"""8-byte puzzle IDs from which a puzzle is generated again, cell for cell.
+
+Every generator draws all its randomness from ``generator.rng``, so a
+puzzle is fixed by its kind, difficulty, ``unique`` flag and the seed of
+the ``random.Random`` it was generated with. An ID packs these into 64
+bits:
+
+    kind (4 bits) | difficulty (2) | unique (1) | reserved (1) | seed (56)
+
+``random.Random`` seeds from an int the same way in every process and
+Python 3 version, and ``parallel.task_seed`` hashes with blake2b, so IDs
+regenerate the same puzzle in worker pools and after restarts. The
+puzzles of ``parallel.generate(kind, count, difficulty, seed)`` have the
+IDs ``batch_ids(kind, count, difficulty, seed)``. Puzzles generated with
+a ``deadline``, or with the "transform" fill mode (which keeps a
+per-process cache of grids), cannot be regenerated from their seed.
+
+On the command line, ``python -m sudoku_generators.puzzle_id 0123456789abcdef``
+prints the puzzle (and ``--solution`` its solution) again.
+"""
+import argparse
+import random
+
+from sudoku_generators import parallel, registry
+
+# Positions are part of the format: only ever append
+KINDS = ("9x9", "12x12", "16x16", "cross", "samurai", "sohei", "double_linked")
+DIFFICULTIES = ("easy", "medium", "hard")
+
+SEED_BITS = 56
+SEED_MASK = (1 << SEED_BITS) - 1
+
+
+def make_id(kind, difficulty, seed, unique=False):
+    if not 0 <= seed <= SEED_MASK:
+        raise ValueError(f"seed must fit in {SEED_BITS} bits")
+    header = KINDS.index(kind) << 4 | DIFFICULTIES.index(difficulty.lower()) << 2
+    return (header | bool(unique) << 1) << SEED_BITS | seed
+
+
+def decode(puzzle_id):
+    """(kind, difficulty, seed, unique) of an ID."""
+    header = puzzle_id >> SEED_BITS
+    if header >> 8 or header & 1 or header >> 4 >= len(KINDS) \
+            or header >> 2 & 3 >= len(DIFFICULTIES):
+        raise ValueError(f"not a puzzle ID: {puzzle_id:#x}")
+    return (KINDS[header >> 4], DIFFICULTIES[header >> 2 & 3], puzzle_id & SEED_MASK,
+            bool(header & 2))
+
+
+def to_bytes(puzzle_id):
+    return puzzle_id.to_bytes(8, "big")
+
+
+def from_bytes(data):
+    return int.from_bytes(data, "big")
+
+
+def format_id(puzzle_id):
+    return f"{puzzle_id:016x}"
+
+
+def parse_id(text):
+    return int(text, 16)
+
+
+def new_id(kind, difficulty="medium", unique=False, rng=random):
+    # A fresh ID with a random seed
+    return make_id(kind, difficulty, rng.getrandbits(SEED_BITS), unique)
+
+
+def regenerate(puzzle_id, solution=False, generator=None):
+    """The puzzle of ``puzzle_id``, or (puzzle, solution) with ``solution``.
+
+    ``generator`` (of the ID's kind, default fill mode) is reused instead
+    of making a new one; its ``rng`` is replaced.
+    """
+    kind, difficulty, seed, unique = decode(puzzle_id)
+    if generator is None:
+        generator = registry.make_generator(kind)
+    generator.rng = random.Random(seed)
+    options = {"unique": True} if unique else {}
+    puzzle = registry.generate_one(generator, kind, difficulty, **options)
+    return (puzzle, generator.solution) if solution else puzzle
+
+
+def batch_ids(kind, count, difficulty, seed, unique=False):
+    # IDs of the puzzles parallel.generate returns for the batch seed
+    return [make_id(kind, difficulty, parallel.task_seed(seed, index), unique)
+            for index in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a puzzle again from its ID")
+    parser.add_argument("ids", nargs="+", help="IDs as 16 hex digits")
+    parser.add_argument("--solution", action="store_true", help="print the solution too")
+    args = parser.parse_args()
+
+    for text in args.ids:
+        puzzle_id = parse_id(text)
+        kind, difficulty, seed, unique = decode(puzzle_id)
+        puzzle, solution = regenerate(puzzle_id, solution=True)
+        print(f"{format_id(puzzle_id)}: {kind} {difficulty}{' unique' if unique else ''}, seed {seed}")
+        print(puzzle)
+        if args.solution:
+            print(solution)
+
+
+if __name__ == "__main__":
+    main()
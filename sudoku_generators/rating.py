@@ -0,0 +1,325 @@
+"""Human-style difficulty rating.
+
+A puzzle is solved with logical techniques only, always applying the
+easiest one that makes progress, and rated by the hardest technique it
+needed. Ratings are cached by a canonical hash of the puzzle, so rating
+the same puzzle (or a digit-relabeled copy of it) again is a lookup.
+"""
+import hashlib
+from collections import OrderedDict, namedtuple
+from itertools import combinations
+
+from sudoku_generators.constraints import popcount_table
+from sudoku_generators.dlx import BOX_SHAPES
+
+# Techniques from easiest to hardest, with the level each one rates as
+TECHNIQUES = (
+    ("naked_single", 1),
+    ("hidden_single", 1),
+    ("pointing", 2),
+    ("box_line", 2),
+    ("naked_pair", 3),
+    ("hidden_pair", 3),
+    ("naked_triple", 4),
+    ("hidden_triple", 4),
+    ("x_wing", 5),
+    ("swordfish", 6),
+)
+# Level of a puzzle the techniques above cannot finish
+GUESSING_LEVEL = 7
+
+Rating = namedtuple("Rating", ["level", "hardest", "steps", "solved"])
+
+RATING_CACHE_SIZE = 100000
+_cache = OrderedDict()
+CACHE_STATS = {"hits": 0, "misses": 0}
+
+_layouts = {}
+
+
+class _Layout:
+    # Units, peers and box lookups for one grid shape, built once
+    def __init__(self, size, box_rows, box_cols):
+        self.size = size
+        self.box_rows = box_rows
+        self.box_cols = box_cols
+        self.popcount = popcount_table(size)
+        cells = range(size * size)
+        boxes_per_row = size // box_cols
+        self.row_of = [cell // size for cell in cells]
+        self.col_of = [cell % size for cell in cells]
+        self.box_of = [(cell // size // box_rows) * boxes_per_row + (cell % size) // box_cols
+                       for cell in cells]
+        self.rows = [[r * size + c for c in range(size)] for r in range(size)]
+        self.cols = [[r * size + c for r in range(size)] for c in range(size)]
+        self.boxes = [[cell for cell in cells if self.box_of[cell] == b] for b in range(size)]
+        self.units = self.rows + self.cols + self.boxes
+        self.peers = [sorted(set(self.rows[self.row_of[cell]] + self.cols[self.col_of[cell]]
+                                 + self.boxes[self.box_of[cell]]) - {cell}) for cell in cells]
+
+
+def _layout(size, box_rows, box_cols):
+    key = (size, box_rows, box_cols)
+    layout = _layouts.get(key)
+    if layout is None:
+        layout = _layouts[key] = _Layout(size, box_rows, box_cols)
+    return layout
+
+
+class _LogicSolver:
+    def __init__(self, layout, cells):
+        self.layout = layout
+        size = layout.size
+        full_mask = (1 << size) - 1
+        self.values = [0] * (size * size)
+        self.cand = [full_mask] * (size * size)
+        self.broken = False
+        for cell, num in enumerate(cells):
+            if num:
+                self.place(cell, num)
+
+    def place(self, cell, num):
+        bit = 1 << (num - 1)
+        if not self.cand[cell] & bit:
+            self.broken = True
+        self.values[cell] = num
+        self.cand[cell] = 0
+        cand = self.cand
+        for peer in self.layout.peers[cell]:
+            cand[peer] &= ~bit
+
+    def eliminate(self, cells, mask):
+        changed = False
+        cand = self.cand
+        for cell in cells:
+            if cand[cell] & mask:
+                cand[cell] &= ~mask
+                changed = True
+        return changed
+
+    # Each technique returns True when it placed or eliminated something
+
+    def naked_single(self):
+        popcount = self.layout.popcount
+        progress = False
+        for cell, mask in enumerate(self.cand):
+            if mask and popcount[mask] == 1:
+                self.place(cell, mask.bit_length())
+                progress = True
+        return progress
+
+    def hidden_single(self):
+        cand = self.cand
+        for unit in self.layout.units:
+            seen_once = 0
+            seen_twice = 0
+            for cell in unit:
+                mask = cand[cell]
+                seen_twice |= seen_once & mask
+                seen_once |= mask
+            single = seen_once & ~seen_twice
+            while single:
+                bit = single & -single
+                single ^= bit
+                for cell in unit:
+                    if cand[cell] & bit:
+                        self.place(cell, bit.bit_length())
+                        return True
+        return False
+
+    def _locked(self, units, other_of, other_units):
+        # Digits of a unit confined to one unit of another kind get removed
+        # from the rest of that other unit
+        cand = self.cand
+        size = self.layout.size
+        for unit in units:
+            for num in range(size):
+                bit = 1 << num
+                cells = [cell for cell in unit if cand[cell] & bit]
+                if len(cells) < 2:
+                    continue
+                targets = set(other_of[cell] for cell in cells)
+                if len(targets) == 1:
+                    rest = [cell for cell in other_units[targets.pop()] if cell not in cells]
+                    if self.eliminate(rest, bit):
+                        return True
+        return False
+
+    def pointing(self):
+        layout = self.layout
+        return (self._locked(layout.boxes, layout.row_of, layout.rows)
+                or self._locked(layout.boxes, layout.col_of, layout.cols))
+
+    def box_line(self):
+        layout = self.layout
+        return (self._locked(layout.rows, layout.box_of, layout.boxes)
+                or self._locked(layout.cols, layout.box_of, layout.boxes))
+
+    def _naked_subset(self, k):
+        cand = self.cand
+        popcount = self.layout.popcount
+        for unit in self.layout.units:
+            open_cells = [cell for cell in unit if cand[cell] and popcount[cand[cell]] <= k]
+            if len(open_cells) < k:
+                continue
+            for group in combinations(open_cells, k):
+                union = 0
+                for cell in group:
+                    union |= cand[cell]
+                if popcount[union] == k:
+                    rest = [cell for cell in unit if cand[cell] and cell not in group]
+                    if self.eliminate(rest, union):
+                        return True
+        return False
+
+    def _hidden_subset(self, k):
+        cand = self.cand
+        size = self.layout.size
+        full_mask = (1 << size) - 1
+        for unit in self.layout.units:
+            places = {}
+            for num in range(size):
+                bit = 1 << num
+                cells = frozenset(cell for cell in unit if cand[cell] & bit)
+                if 2 <= len(cells) <= k:
+                    places[bit] = cells
+            if len(places) < k:
+                continue
+            for digits in combinations(places, k):
+                union = frozenset().union(*(places[bit] for bit in digits))
+                if len(union) == k:
+                    keep = 0
+                    for bit in digits:
+                        keep |= bit
+                    if self.eliminate(union, full_mask & ~keep):
+                        return True
+        return False
+
+    def naked_pair(self):
+        return self._naked_subset(2)
+
+    def hidden_pair(self):
+        return self._hidden_subset(2)
+
+    def naked_triple(self):
+        return self._naked_subset(3)
+
+    def hidden_triple(self):
+        return self._hidden_subset(3)
+
+    def _fish(self, k):
+        layout = self.layout
+        cand = self.cand
+        for bases, covers, cover_of in ((layout.rows, layout.cols, layout.col_of),
+                                        (layout.cols, layout.rows, layout.row_of)):
+            for num in range(layout.size):
+                bit = 1 << num
+                lines = []
+                for unit in bases:
+                    spots = frozenset(cover_of[cell] for cell in unit if cand[cell] & bit)
+                    if 2 <= len(spots) <= k:
+                        lines.append((unit, spots))
+                for group in combinations(lines, k):
+                    union = frozenset().union(*(spots for _, spots in group))
+                    if len(union) != k:
+                        continue
+                    inside = set(cell for unit, _ in group for cell in unit)
+                    rest = [cell for index in union for cell in covers[index] if cell not in inside]
+                    if self.eliminate(rest, bit):
+                        return True
+        return False
+
+    def x_wing(self):
+        return self._fish(2)
+
+    def swordfish(self):
+        return self._fish(3)
+
+    def solve(self):
+        hardest_rank = -1
+        steps = 0
+        while not self.broken and 0 in self.values:
+            if any(not mask for cell, mask in enumerate(self.cand) if not self.values[cell]):
+                self.broken = True
+                break
+            for rank, (name, _) in enumerate(TECHNIQUES):
+                if getattr(self, name)():
+                    steps += 1
+                    hardest_rank = max(hardest_rank, rank)
+                    break
+            else:
+                break
+        solved = not self.broken and 0 not in self.values
+        if not solved:
+            return Rating(GUESSING_LEVEL, "guessing", steps, False)
+        if hardest_rank < 0:
+            return Rating(0, None, steps, True)
+        name, level = TECHNIQUES[hardest_rank]
+        return Rating(level, name, steps, True)
+
+
+def canonical_key(puzzle, box_rows, box_cols):
+    """Hash of the puzzle with digits relabeled by first appearance."""
+    relabel = {0: 0}
+    cells = bytearray()
+    for row in puzzle:
+        for num in row:
+            if num not in relabel:
+                relabel[num] = len(relabel)
+            cells.append(relabel[num])
+    digest = hashlib.blake2b(bytes(cells), digest_size=16)
+    digest.update(bytes((len(puzzle), box_rows, box_cols)))
+    return digest.digest()
+
+
+def rate_puzzle(puzzle, box_rows=None, box_cols=None):
+    """Rate a single grid (0 for blanks) by the hardest technique it needs."""
+    size = len(puzzle)
+    if box_rows is None or box_cols is None:
+        box_rows, box_cols = BOX_SHAPES[size]
+    key = canonical_key(puzzle, box_rows, box_cols)
+    rating = _cache.get(key)
+    if rating is not None:
+        CACHE_STATS["hits"] += 1
+        _cache.move_to_end(key)
+        return rating
+
+    CACHE_STATS["misses"] += 1
+    cells = [num for row in puzzle for num in row]
+    rating = _LogicSolver(_layout(size, box_rows, box_cols), cells).solve()
+    _cache[key] = rating
+    if len(_cache) > RATING_CACHE_SIZE:
+        _cache.popitem(last=False)
+    return rating
+
+
+def component_grids(puzzle):
+    """Yield the grids inside any generator result.
+
+    Accepts a single grid, or the dicts and tuples returned by the cross,
+    samurai, sohei and double-linked generators.
+    """
+    if isinstance(puzzle, dict):
+        for part in puzzle.values():
+            for grid in component_grids(part):
+                yield grid
+    elif len(puzzle) and isinstance(puzzle[0][0], int):
+        yield puzzle
+    else:
+        for part in puzzle:
+            for grid in component_grids(part):
+                yield grid
+
+
+def rate(puzzle):
+    """Rating of any generator result: the hardest of its grids.
+
+    Each 9x9 of an overlapping variant is rated on its own, which ignores
+    help from the shared cells and so errs on the hard side.
+    """
+    worst = None
+    for grid in component_grids(puzzle):
+        rating = rate_puzzle(grid)
+        if worst is None or (rating.level, rating.steps) > (worst.level, worst.steps):
+            worst = rating
+    return worst
@@ -0,0 +1,131 @@
+"""Generator classes and PDF renderers by puzzle kind.
+
+Generator modules are loaded on first use and kept for the rest of the
+process (``sys.modules`` survives Streamlit reruns). Files such as
+``classic/9x9_sudoku.py`` cannot be imported by name, so they are loaded
+from their paths and registered as ``sudoku_generators.classic.sudoku_9x9``.
+Loading a generator does not import reportlab; the PDF functions import it
+when first called.
+"""
+import importlib.util
+import io
+import os
+import sys
+
+from sudoku_generators import batch
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# kind: (module file, generator class, method returning one puzzle)
+GENERATORS = {
+    "9x9": ("classic/9x9_sudoku.py", "SudokuGenerator", "generate_puzzle"),
+    "12x12": ("classic/12x12_sudoku.py", "SudokuGenerator", "generate_puzzle"),
+    "16x16": ("classic/16x16_sudoku.py", "SudokuGenerator", "generate_puzzle"),
+    "cross": ("special/cross_sudoku.py", "CrossSudokuGenerator", "generate_cross_puzzle"),
+    "samurai": ("special/samurai_sudoku.py", "SamuraiSudokuGenerator", "generate_samurai_puzzles"),
+    "sohei": ("special/sohei_sudoku.py", "SoheiSudokuGenerator", "generate_sohei_puzzle"),
+    "double_linked": ("special/double_linked_sudoku.py", "SudokuGenerator",
+                      "generate_linked_puzzles"),
+}
+
+# kind: (grid size, PuzzleBatch template of one puzzle)
+LAYOUTS = {
+    "9x9": (9, batch.SINGLE),
+    "12x12": (12, batch.SINGLE),
+    "16x16": (16, batch.SINGLE),
+    "cross": (9, batch.CROSS),
+    "samurai": (9, batch.SAMURAI),
+    "sohei": (9, batch.SOHEI),
+    "double_linked": (9, batch.LINKED),
+}
+
+# kind: (PDF function, whether it takes puzzles_per_page)
+PDF_RENDERERS = {
+    "9x9": ("create_pdf_with_sudoku", True),
+    "12x12": ("create_pdf_with_sudoku", True),
+    "16x16": ("create_pdf_with_sudoku", True),
+    "cross": ("create_pdf_with_cross_sudoku", False),
+    "samurai": ("create_pdf_with_samurai_sudoku", False),
+    "sohei": ("create_pdf_with_sohei_sudoku", False),
+    "double_linked": ("create_pdf_with_linked_sudoku", False),
+}
+
+# Kinds whose PDF titles number the puzzles; their renderers take first_number
+NUMBERED_PDFS = ("9x9", "12x12")
+
+_modules = {}
+
+
+def _entry(kind):
+    if kind not in GENERATORS:
+        raise ValueError(f"Unknown sudoku kind: {kind}")
+    return GENERATORS[kind]
+
+
+def module_name(kind):
+    folder, filename = _entry(kind)[0].split("/")
+    stem = os.path.splitext(filename)[0]
+    if not stem.isidentifier():
+        # 9x9_sudoku -> sudoku_9x9
+        stem = "sudoku_" + stem.split("_")[0]
+    return f"sudoku_generators.{folder}.{stem}"
+
+
+def load_module(kind):
+    module = _modules.get(kind)
+    if module is None:
+        name = module_name(kind)
+        module = sys.modules.get(name)
+        if module is None:
+            path = os.path.join(PACKAGE_DIR, _entry(kind)[0])
+            spec = importlib.util.spec_from_file_location(name, path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[name] = module
+            try:
+                spec.loader.exec_module(module)
+            except BaseException:
+                del sys.modules[name]
+                raise
+        # Bound in its package as a normal import would, so that
+        # "import sudoku_generators.classic.sudoku_9x9" finds it later
+        parent, _, stem = name.rpartition(".")
+        setattr(importlib.import_module(parent), stem, module)
+        _modules[kind] = module
+    return module
+
+
+def generator_class(kind):
+    return getattr(load_module(kind), _entry(kind)[1])
+
+
+def make_generator(kind, **kwargs):
+    return generator_class(kind)(**kwargs)
+
+
+def generate_one(generator, kind, difficulty="medium", **options):
+    # Call the kind's single-puzzle method, whatever it is named
+    return getattr(generator, _entry(kind)[2])(difficulty, **options)
+
+
+def render_pdf(kind, puzzles, difficulty, filename, puzzles_per_page=1, first_number=1):
+    """Render ``puzzles`` with the kind's PDF function.
+
+    ``filename`` is a path or a binary file object (reportlab writes to
+    either). The variant renderers have a fixed layout and ignore
+    ``puzzles_per_page``. ``first_number`` is the number the titles give
+    the first puzzle, for kinds in ``NUMBERED_PDFS``.
+    """
+    name, paged = PDF_RENDERERS[kind]
+    render = getattr(load_module(kind), name)
+    if kind in NUMBERED_PDFS:
+        return render(puzzles, difficulty, puzzles_per_page, filename, first_number)
+    if paged:
+        return render(puzzles, difficulty, puzzles_per_page, filename)
+    return render(puzzles, difficulty, filename)
+
+
+def render_pdf_bytes(kind, puzzles, difficulty, puzzles_per_page=1, first_number=1):
+    # Render into memory, for HTTP responses and caches
+    output = io.BytesIO()
+    render_pdf(kind, puzzles, difficulty, output, puzzles_per_page, first_number)
+    return output.getvalue()
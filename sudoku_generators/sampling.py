@@ -0,0 +1,98 @@
+"""Rejection sampling of puzzles into a difficulty band.
+
+Candidates are generated and rated until one falls inside the band of the
+requested difficulty or the deadline passes; on a miss the candidate whose
+rating was closest to the band is returned. Attempts and acceptances are
+recorded per (size, difficulty) so the cost of each band can be watched.
+"""
+import random
+import time
+from collections import Counter, defaultdict
+
+from sudoku_generators import rating
+from sudoku_generators.digging import UniqueDigger
+
+# Rating levels (see rating.TECHNIQUES) accepted for each difficulty
+DIFFICULTY_BANDS = {
+    "easy": (0, 1),
+    "medium": (2, 3),
+    "hard": (4, rating.GUESSING_LEVEL),
+}
+
+STATS = defaultdict(Counter)
+
+
+def band_distance(level, band):
+    low, high = band
+    if level < low:
+        return low - level
+    if level > high:
+        return level - high
+    return 0
+
+
+def dig_to_band(solution, remove_count, difficulty, box_rows=None, box_cols=None, rng=random,
+                deadline=None):
+    """Dig ``solution`` uniquely, then keep digging until it rates in band.
+
+    Removals that would push the rating past the band are undone and the
+    next cell is tried instead, so a candidate lands in the band far more
+    often than one dug to a fixed clue count. Once ``time.monotonic()``
+    passes ``deadline`` no more cells are dug or rated, and the puzzle dug
+    so far is returned.
+    """
+    low, high = DIFFICULTY_BANDS.get(difficulty.lower(), DIFFICULTY_BANDS["medium"])
+    digger = UniqueDigger(solution, box_rows, box_cols)
+    cells = [(i, j) for i in range(digger.size) for j in range(digger.size)]
+    rng.shuffle(cells)
+
+    removed = 0
+    for row, col in cells:
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        if not digger.try_remove(row, col):
+            continue
+        removed += 1
+        if removed < remove_count or (deadline is not None and time.monotonic() >= deadline):
+            continue
+        level = rating.rate_puzzle(digger.puzzle, box_rows, box_cols).level
+        if level > high:
+            digger.restore(row, col)
+            removed -= 1
+        elif level >= low:
+            break
+    return digger.puzzle
+
+
+def sample(make_candidate, size, difficulty, deadline):
+    """Draw candidates from ``make_candidate(deadline)`` until one is in the band.
+
+    ``deadline`` is a ``time.monotonic()`` timestamp; at least one candidate
+    is always drawn, and ``make_candidate`` should cut it short once the
+    deadline passes. Returns ``(puzzle, rating)``.
+    """
+    difficulty = difficulty.lower()
+    band = DIFFICULTY_BANDS.get(difficulty, DIFFICULTY_BANDS["medium"])
+    stats = STATS[(size, difficulty)]
+
+    best = None
+    best_distance = None
+    while True:
+        puzzle = make_candidate(deadline)
+        puzzle_rating = rating.rate(puzzle)
+        stats["attempts"] += 1
+        distance = band_distance(puzzle_rating.level, band)
+        if best is None or distance < best_distance:
+            best, best_distance = (puzzle, puzzle_rating), distance
+        if distance == 0:
+            stats["accepted"] += 1
+            return best
+        if time.monotonic() >= deadline:
+            stats["missed"] += 1
+            return best
+
+
+def acceptance_rates():
+    # Fraction of candidates accepted per (size, difficulty)
+    return {key: stats["accepted"] / stats["attempts"]
+            for key, stats in STATS.items() if stats["attempts"]}
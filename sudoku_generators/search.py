@@ -0,0 +1,335 @@
+"""Grid fill strategies shared by the generators.
+
+Every filler works in place on a ``grid`` (list of rows) together with a
+``CandidateGrid`` that is kept in sync with it, and takes an ``rng`` with
+the ``random`` module interface so callers can control the randomness.
+"""
+import random
+
+from sudoku_generators import dlx
+from sudoku_generators.constraints import mask_digits
+from sudoku_generators.transforms import transform_solution
+
+# Starting node budget per empty cell for a single MRV attempt; doubled on
+# every restart so the search stays complete for any satisfiable grid
+MRV_NODES_PER_CELL = 8
+MRV_RESTARTS = 6
+
+# One searched solution per box shape, reshuffled by fill_transformed
+SEED_GRIDS = {}
+
+
+def fill_row_major(grid, constraints, rng=random):
+    # Plain backtracking over the cells in reading order
+    size = constraints.size
+    for i in range(size):
+        for j in range(size):
+            if grid[i][j] == 0:
+                numbers = list(range(1, size + 1))
+                rng.shuffle(numbers)
+                for num in numbers:
+                    if constraints.allows(i, j, num):
+                        grid[i][j] = num
+                        constraints.place(i, j, num)
+                        if fill_row_major(grid, constraints, rng):
+                            return True
+                        constraints.remove(i, j, num)
+                        grid[i][j] = 0
+                return False
+    return True
+
+
+def fill_iterative(grid, constraints, rng=random):
+    """Reading-order backtracking driven by an explicit stack.
+
+    Makes the same choices as ``fill_row_major`` (and consumes ``rng`` the
+    same way, so a seeded run gives the same grid) without one Python frame
+    per filled cell. The search runs on a flat preallocated cell array that
+    is copied back into ``grid`` only on success.
+    """
+    size = constraints.size
+    rows, cols, boxes = constraints.rows, constraints.cols, constraints.boxes
+    cells = [0] * (size * size)
+    for i in range(size):
+        cells[i * size:(i + 1) * size] = grid[i]
+
+    empty = [cell for cell in range(size * size) if cells[cell] == 0]
+    total = len(empty)
+    row_of = [constraints.cell_row[cell] for cell in empty]
+    col_of = [constraints.cell_col[cell] for cell in empty]
+    box_of = [constraints.cell_box[cell] for cell in empty]
+
+    # One stack frame per empty cell: its shuffled digits and the next to try
+    choices = [None] * total
+    next_choice = [0] * total
+
+    depth = 0
+    while depth < total:
+        cell = empty[depth]
+        row, col, box = row_of[depth], col_of[depth], box_of[depth]
+        numbers = choices[depth]
+        if numbers is None:
+            numbers = list(range(1, size + 1))
+            rng.shuffle(numbers)
+            choices[depth] = numbers
+            next_choice[depth] = 0
+        elif cells[cell]:
+            # Coming back up the stack: undo the digit placed here
+            bit = ~(1 << (cells[cell] - 1))
+            rows[row] &= bit
+            cols[col] &= bit
+            boxes[box] &= bit
+            cells[cell] = 0
+
+        placed = False
+        used = rows[row] | cols[col] | boxes[box]
+        for index in range(next_choice[depth], size):
+            num = numbers[index]
+            bit = 1 << (num - 1)
+            if not used & bit:
+                cells[cell] = num
+                rows[row] |= bit
+                cols[col] |= bit
+                boxes[box] |= bit
+                next_choice[depth] = index + 1
+                placed = True
+                break
+
+        if placed:
+            depth += 1
+        else:
+            choices[depth] = None
+            depth -= 1
+            if depth < 0:
+                return False
+
+    for i in range(size):
+        grid[i][:] = cells[i * size:(i + 1) * size]
+    return True
+
+
+def fill_mrv(grid, constraints, rng=random, node_limit=None):
+    """Fill ``grid`` always branching on the empty cell with fewest candidates.
+
+    Empty cells are kept in an indexed set (a list with swap-with-last
+    removal) so taking a cell out and putting it back is O(1). Returns False
+    when the grid has no completion or when more than ``node_limit``
+    placements were tried; in both cases the grid is left as it was.
+    """
+    size = constraints.size
+    full_mask = constraints.full_mask
+    rows, cols, boxes = constraints.rows, constraints.cols, constraints.boxes
+    popcount = constraints.popcount
+    digits = constraints.digits
+    row_of, col_of, box_of = constraints.cell_row, constraints.cell_col, constraints.cell_box
+
+    empty = [i * size + j for i in range(size) for j in range(size) if grid[i][j] == 0]
+    nodes = [0]
+
+    def search():
+        if not empty:
+            return True
+
+        # Pick the most constrained empty cell
+        best_index = -1
+        best_count = size + 1
+        best_mask = 0
+        for index, cell in enumerate(empty):
+            mask = ~(rows[row_of[cell]] | cols[col_of[cell]] | boxes[box_of[cell]]) & full_mask
+            count = popcount[mask]
+            if count < best_count:
+                best_index, best_count, best_mask = index, count, mask
+                if count <= 1:
+                    break
+        if best_count == 0:
+            return False
+
+        # Take the cell out of the empty set (swap with the last entry)
+        cell = empty[best_index]
+        empty[best_index] = empty[-1]
+        empty.pop()
+
+        row, col, box = row_of[cell], col_of[cell], box_of[cell]
+        numbers = list(mask_digits(digits, best_mask))
+        rng.shuffle(numbers)
+        for num in numbers:
+            nodes[0] += 1
+            if node_limit is not None and nodes[0] > node_limit:
+                break
+            bit = 1 << (num - 1)
+            grid[row][col] = num
+            rows[row] |= bit
+            cols[col] |= bit
+            boxes[box] |= bit
+            if search():
+                return True
+            rows[row] &= ~bit
+            cols[col] &= ~bit
+            boxes[box] &= ~bit
+            grid[row][col] = 0
+
+        # Put the cell back where it was
+        if best_index == len(empty):
+            empty.append(cell)
+        else:
+            empty.append(empty[best_index])
+            empty[best_index] = cell
+        return False
+
+    return search()
+
+
+def count_solutions(grid, constraints, limit=2, exclude=None, node_limit=None,
+                    solutions=None, synced=False):
+    """Count completions of ``grid``, stopping once ``limit`` are found.
+
+    ``exclude`` is an optional (row, col, num) placement that is ruled out,
+    which turns "is there a second solution?" into "is there any solution
+    without the known digit here?". Returns None when more than
+    ``node_limit`` placements were tried, so the caller can hand the grid
+    to a stronger solver. Completions found are appended to ``solutions``
+    when a list is given. With ``synced`` the masks in ``constraints`` are
+    trusted to match ``grid`` instead of being rebuilt; either way they and
+    the grid are left as they were.
+    """
+    size = constraints.size
+    full_mask = constraints.full_mask
+    popcount = constraints.popcount
+    if not synced:
+        constraints.load(grid)
+    rows, cols, boxes = constraints.rows, constraints.cols, constraints.boxes
+    box_of = constraints.cell_box
+
+    empty = [i * size + j for i in range(size) for j in range(size) if grid[i][j] == 0]
+    banned = [0] * (size * size)
+    if exclude is not None:
+        row, col, num = exclude
+        banned[row * size + col] = 1 << (num - 1)
+    assigned = [0] * (size * size)
+    found = [0]
+    nodes = [0]
+
+    def search():
+        if not empty:
+            found[0] += 1
+            if solutions is not None:
+                solutions.append([[grid[i][j] or assigned[i * size + j] for j in range(size)]
+                                  for i in range(size)])
+            return found[0] >= limit
+
+        best_index = -1
+        best_count = size + 1
+        best_mask = 0
+        for index, cell in enumerate(empty):
+            row = cell // size
+            mask = ~(rows[row] | cols[cell - row * size] | boxes[box_of[cell]] | banned[cell]) & full_mask
+            count = popcount[mask]
+            if count < best_count:
+                best_index, best_count, best_mask = index, count, mask
+                if count <= 1:
+                    break
+        if best_count == 0:
+            return False
+
+        cell = empty[best_index]
+        empty[best_index] = empty[-1]
+        empty.pop()
+
+        row = cell // size
+        col = cell - row * size
+        box = box_of[cell]
+        done = False
+        while best_mask:
+            nodes[0] += 1
+            if node_limit is not None and nodes[0] > node_limit:
+                done = True
+                break
+            bit = best_mask & -best_mask
+            best_mask ^= bit
+            assigned[cell] = bit.bit_length()
+            rows[row] |= bit
+            cols[col] |= bit
+            boxes[box] |= bit
+            done = search()
+            rows[row] ^= bit
+            cols[col] ^= bit
+            boxes[box] ^= bit
+            if done:
+                break
+
+        if best_index == len(empty):
+            empty.append(cell)
+        else:
+            empty.append(empty[best_index])
+            empty[best_index] = cell
+        return done
+
+    search()
+    if node_limit is not None and nodes[0] > node_limit:
+        return None
+    return found[0]
+
+
+def fill_mrv_restarting(grid, constraints, rng=random):
+    # Heavy-tailed runs are cut short and retried with a fresh random order
+    empty_count = sum(row.count(0) for row in grid)
+    node_limit = max(1, empty_count) * MRV_NODES_PER_CELL
+    for _ in range(MRV_RESTARTS):
+        if fill_mrv(grid, constraints, rng, node_limit):
+            return True
+        node_limit *= 2
+    return fill_mrv(grid, constraints, rng)
+
+
+def fill_transformed(grid, constraints, rng=random):
+    """Fill an empty grid by transforming a cached solution; no search.
+
+    The first call for a box shape searches one solution with MRV and caches
+    it. Grids with preset cells cannot be served from the cache and fall
+    back to the MRV search.
+    """
+    if any(any(row) for row in grid):
+        return fill_mrv_restarting(grid, constraints, rng)
+
+    shape = (constraints.size, constraints.box_rows, constraints.box_cols)
+    seed_grid = SEED_GRIDS.get(shape)
+    if seed_grid is None:
+        if not fill_mrv_restarting(grid, constraints, rng):
+            return False
+        SEED_GRIDS[shape] = [row[:] for row in grid]
+        return True
+
+    solution = transform_solution(seed_grid, constraints.box_rows, constraints.box_cols, rng)
+    for i in range(constraints.size):
+        grid[i][:] = solution[i]
+    constraints.load(grid)
+    return True
+
+
+def fill_dlx(grid, constraints, rng=random):
+    # Random completion found by the shared Dancing Links engine
+    solution = dlx.solver_for(constraints.size, constraints.box_rows,
+                              constraints.box_cols).random_solution(grid, rng)
+    if solution is None:
+        return False
+    for i in range(constraints.size):
+        grid[i][:] = solution[i]
+    constraints.load(grid)
+    return True
+
+
+FILL_MODES = {
+    "row_major": fill_row_major,
+    "iterative": fill_iterative,
+    "mrv": fill_mrv_restarting,
+    "transform": fill_transformed,
+    "dlx": fill_dlx,
+}
+
+
+def fill(grid, constraints, mode="mrv", rng=random):
+    if mode not in FILL_MODES:
+        raise ValueError(f"Unknown fill mode: {mode}")
+    # Sync the occupancy masks with any cells preset in the grid
+    constraints.load(grid)
+    return FILL_MODES[mode](grid, constraints, rng)
@@ -0,0 +1,141 @@
+"""Memory-bounded caches for results generated by app sessions.
+
+Each session keeps a ``SessionCache`` (e.g. in ``st.session_state``), an
+LRU of results with a byte limit. All caches of a process share one
+``CacheBudget`` with a global byte limit; when it is exceeded, the least
+recently used entries are dropped, whichever session they belong to.
+Caches of finished sessions are garbage collected and leave the budget.
+"""
+import itertools
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+from sudoku_generators.puzzle import Puzzle
+
+
+def deep_sizeof(value):
+    # Rough bytes held by nested lists, tuples, dicts, bytes and Puzzles;
+    # small ints are shared and not counted
+    size = sys.getsizeof(value)
+    if isinstance(value, Puzzle):
+        size += sys.getsizeof(value.data)
+    elif isinstance(value, dict):
+        size += sum(deep_sizeof(item) for item in value.values())
+    elif isinstance(value, (list, tuple)):
+        size += sum(deep_sizeof(item) for item in value if not isinstance(item, int))
+    return size
+
+
+class CacheBudget:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self.lock = threading.RLock()
+        self._caches = weakref.WeakSet()
+        self._clock = itertools.count()
+
+    def register(self, cache):
+        with self.lock:
+            self._caches.add(cache)
+
+    def tick(self):
+        return next(self._clock)
+
+    @property
+    def nbytes(self):
+        with self.lock:
+            return sum(cache.nbytes for cache in list(self._caches))
+
+    def shrink(self):
+        # Drop the least recently used entries of any session until the
+        # caches fit in max_bytes again
+        with self.lock:
+            total = self.nbytes
+            while total > self.max_bytes:
+                caches = [cache for cache in list(self._caches) if cache.nbytes]
+                if not caches:
+                    break
+                oldest = min(caches, key=lambda cache: cache.oldest_tick())
+                total -= oldest.pop_oldest()
+                self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "sessions": len(self._caches),
+                "nbytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
+
+
+class SessionCache:
+    """LRU of (key -> value) with a byte limit, inside a shared budget."""
+
+    def __init__(self, budget, max_bytes):
+        self.budget = budget
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        # key: [last use, size in bytes, value]
+        self._entries = OrderedDict()
+        budget.register(self)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self.budget.lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            entry[0] = self.budget.tick()
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, value, nbytes=None):
+        """Store ``value``; returns False if it is larger than the limit.
+
+        ``nbytes`` defaults to ``deep_sizeof(value)``.
+        """
+        if nbytes is None:
+            nbytes = deep_sizeof(value)
+        with self.budget.lock:
+            self.discard(key)
+            if nbytes > self.max_bytes or nbytes > self.budget.max_bytes:
+                return False
+            self._entries[key] = [self.budget.tick(), nbytes, value]
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                self.pop_oldest()
+                self.budget.evictions += 1
+            self.budget.shrink()
+            return key in self._entries
+
+    def discard(self, key):
+        with self.budget.lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.nbytes -= entry[1]
+
+    def oldest_tick(self):
+        return next(iter(self._entries.values()))[0]
+
+    def pop_oldest(self):
+        # Returns the bytes freed
+        _, entry = self._entries.popitem(last=False)
+        self.nbytes -= entry[1]
+        return entry[1]
+
+    def clear(self):
+        with self.budget.lock:
+            self._entries.clear()
+            self.nbytes = 0
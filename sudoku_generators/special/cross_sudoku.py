@@ -1,10 +1,27 @@
+import os
 import random
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+import sys
+
+# Make the shared sudoku_generators package importable when run as a script
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from sudoku_generators import pdf_grids, search
+from sudoku_generators.constraints import CandidateGrid
 
 class CrossSudokuGenerator:
-    def __init__(self):
+    def __init__(self, fill_mode="iterative", seed=None, rng=None):
         self.grid = [[0]*9 for _ in range(9)]
+        self.constraints = CandidateGrid(9, 3, 3)
+        self.fill_mode = fill_mode
+        # Every random choice goes through self.rng; pass a random.Random
+        # or a seed to make the puzzles repeatable
+        if rng is None:
+            rng = random.Random(seed) if seed is not None else random
+        self.rng = rng
+        # Complete grids behind the last puzzle returned
+        self.solution = None
     
     def is_valid(self, row, col, num):
         for x in range(9):
@@ -19,19 +36,9 @@ class CrossSudokuGenerator:
         return True
     
     def fill_grid(self):
-        for i in range(9):
-            for j in range(9):
-                if self.grid[i][j] == 0:
-                    numbers = list(range(1, 10))
-                    random.shuffle(numbers)
-                    for num in numbers:
-                        if self.is_valid(i, j, num):
-                            self.grid[i][j] = num
-                            if self.fill_grid():
-                                return True
-                            self.grid[i][j] = 0
-                    return False
-        return True
+        # Presets from the shared blocks are picked up by search.fill; the
+        # default "iterative" filler avoids one Python frame per cell
+        return search.fill(self.grid, self.constraints, self.fill_mode, self.rng)
     
     def generate_cross_puzzle(self, difficulty="medium"):
         # Generate center puzzle first
@@ -80,6 +87,8 @@ class CrossSudokuGenerator:
             'right': right_puzzle
         }
         
+        self.solution = {name: [row[:] for row in grid] for name, grid in puzzles.items()}
+        
         # Remove numbers for difficulty
         difficulty_levels = {
             "easy": 35,
@@ -90,7 +99,7 @@ class CrossSudokuGenerator:
         
         for puzzle in puzzles.values():
             cells = [(i, j) for i in range(9) for j in range(9)]
-            random.shuffle(cells)
+            self.rng.shuffle(cells)
             for _ in range(remove_count):
                 if cells:
                     row, col = cells.pop()
@@ -98,6 +107,41 @@ class CrossSudokuGenerator:
         
         return puzzles
 
+# Define cross areas
+def is_in_cross(row, col):
+    vertical_part = 6 <= col <= 14 and 0 <= row <= 20
+    horizontal_part = 6 <= row <= 14 and 0 <= col <= 20
+    return vertical_part or horizontal_part
+
+def cross_line_extents():
+    # For each of the 22 horizontal lines, the first and last column it
+    # borders (and the same for vertical lines by row), or None
+    rows = []
+    for i in range(22):
+        cols = [j for j in range(22) if is_in_cross(i, j) or is_in_cross(i-1, j)]
+        rows.append((cols[0], cols[-1]) if cols else None)
+    columns = []
+    for j in range(22):
+        cells = [i for i in range(22) if is_in_cross(i, j) or is_in_cross(i, j-1)]
+        columns.append((cells[0], cells[-1]) if cells else None)
+    return rows, columns
+
+ROW_EXTENTS, COLUMN_EXTENTS = cross_line_extents()
+
+def draw_cross_outline(c, cell_size):
+    # Grid lines of the cross, top-left corner at (0, 0)
+    for i, extent in enumerate(ROW_EXTENTS):
+        if extent is not None:
+            c.setLineWidth(2 if i % 3 == 0 else 1)
+            start_col, end_col = extent
+            c.line(start_col * cell_size, -i * cell_size, (end_col + 1) * cell_size, -i * cell_size)
+    
+    for j, extent in enumerate(COLUMN_EXTENTS):
+        if extent is not None:
+            c.setLineWidth(2 if j % 3 == 0 else 1)
+            start_row, end_row = extent
+            c.line(j * cell_size, -start_row * cell_size, j * cell_size, -(end_row + 1) * cell_size)
+
 def draw_cross_combined_grid(c, puzzles, start_x, start_y):
     cell_size = 15  # Increased from 12 to 15
     
@@ -129,63 +173,25 @@ def draw_cross_combined_grid(c, puzzles, start_x, start_y):
         for j in range(6):
             combined[i + 6][j + 15] = puzzles['right'][i][j + 3]
     
-    # Define cross areas
-    def is_in_cross(row, col):
-        vertical_part = 6 <= col <= 14 and 0 <= row <= 20
-        horizontal_part = 6 <= row <= 14 and 0 <= col <= 20
-        return vertical_part or horizontal_part
+    # Draw the cross outline (one form per document, placed by reference)
+    pdf_grids.place(c, f"cross_{cell_size}", start_x, start_y, 21 * cell_size, 21 * cell_size,
+                    lambda c: draw_cross_outline(c, cell_size))
     
-    # Draw all horizontal lines
-    for i in range(22):
-        if i > 21:
-            continue
-        line_width = 2 if i % 3 == 0 else 1
-        c.setLineWidth(line_width)
-        
-        # Find horizontal extent for this row
-        start_col = None
-        end_col = None
-        for j in range(22):
-            if is_in_cross(i, j) or is_in_cross(i-1, j):
-                if start_col is None:
-                    start_col = j
-                end_col = j
-        
-        if start_col is not None and end_col is not None:
-            c.line(start_x + start_col * cell_size, start_y - i * cell_size,
-                   start_x + (end_col + 1) * cell_size, start_y - i * cell_size)
-    
-    # Draw all vertical lines
-    for j in range(22):
-        if j > 21:
-            continue
-        line_width = 2 if j % 3 == 0 else 1
-        c.setLineWidth(line_width)
-        
-        # Find vertical extent for this column
-        start_row = None
-        end_row = None
-        for i in range(22):
-            if is_in_cross(i, j) or is_in_cross(i, j-1):
-                if start_row is None:
-                    start_row = i
-                end_row = i
-        
-        if start_row is not None and end_row is not None:
-            c.line(start_x + j * cell_size, start_y - start_row * cell_size,
-                   start_x + j * cell_size, start_y - (end_row + 1) * cell_size)
-    
-    # Fill numbers
-    c.setFont("Helvetica", 10)  # Increased from 8 to 10
+    # Fill numbers (one text object per puzzle)
+    clues = []
     for i in range(21):
         for j in range(21):
             if combined[i][j] != 0:
                 if is_in_cross(i, j):
                     x = start_x + j * cell_size + cell_size/2 - 3
                     y = start_y - i * cell_size - cell_size/2 - 3
-                    c.drawString(x, y, str(combined[i][j]))
+                    clues.append((x, y, str(combined[i][j])))
+    pdf_grids.draw_clues(c, "Helvetica", 10, clues)  # Increased from 8 to 10
 
 def create_pdf_with_cross_sudoku(cross_puzzles, difficulty, filename):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    
     c = canvas.Canvas(filename, pagesize=letter)
     width, height = letter
     
@@ -231,14 +237,21 @@ def main():
     # CHANGE NUMBER OF PUZZLES TO GENERATE
     NUM_PUZZLES = 20
     
+    # CHANGE NUMBER OF WORKER PROCESSES (1 = one after another here)
+    WORKERS = 1
+    
     generator = CrossSudokuGenerator()
     cross_puzzles = []
     
     print(f"Generating {NUM_PUZZLES} {DIFFICULTY} Cross Sudoku puzzles...")
-    for i in range(NUM_PUZZLES):
-        puzzles = generator.generate_cross_puzzle(DIFFICULTY)
-        cross_puzzles.append(puzzles)
-        print(f"Cross puzzle {i+1} generated")
+    if WORKERS > 1:
+        from sudoku_generators import parallel
+        cross_puzzles = parallel.generate("cross", NUM_PUZZLES, DIFFICULTY, workers=WORKERS)
+    else:
+        for i in range(NUM_PUZZLES):
+            puzzles = generator.generate_cross_puzzle(DIFFICULTY)
+            cross_puzzles.append(puzzles)
+            print(f"Cross puzzle {i+1} generated")
     
     filename = f"{DIFFICULTY}_cross_sudoku_puzzles.pdf"
     print(f"Creating PDF: {filename}")
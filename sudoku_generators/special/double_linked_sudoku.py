@@ -1,11 +1,28 @@
+import os
 import random
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
+import sys
+
+# Make the shared sudoku_generators package importable when run as a script
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from sudoku_generators import pdf_grids, search
+from sudoku_generators.constraints import CandidateGrid
+from sudoku_generators.digging import UniqueDigger
 
 class SudokuGenerator:
-    def __init__(self):
+    def __init__(self, fill_mode="iterative", seed=None, rng=None):
         self.grid = [[0]*9 for _ in range(9)]
+        self.constraints = CandidateGrid(9, 3, 3)
+        self.fill_mode = fill_mode
+        # Every random choice goes through self.rng; pass a random.Random
+        # or a seed to make the puzzles repeatable
+        if rng is None:
+            rng = random.Random(seed) if seed is not None else random
+        self.rng = rng
+        # Complete grids behind the last puzzle returned
+        self.solution = None
     
     def is_valid(self, row, col, num):
         for x in range(9):
@@ -20,30 +37,29 @@ class SudokuGenerator:
         return True
     
     def fill_grid(self):
-        for i in range(9):
-            for j in range(9):
-                if self.grid[i][j] == 0:
-                    numbers = list(range(1, 10))
-                    random.shuffle(numbers)
-                    for num in numbers:
-                        if self.is_valid(i, j, num):
-                            self.grid[i][j] = num
-                            if self.fill_grid():
-                                return True
-                            self.grid[i][j] = 0
-                    return False
-        return True
+        # Presets from the shared blocks are picked up by search.fill; the
+        # default "iterative" filler avoids one Python frame per cell
+        return search.fill(self.grid, self.constraints, self.fill_mode, self.rng)
     
-    def remove_numbers_from_grid(self, grid, difficulty):
+    def remove_numbers_from_grid(self, grid, difficulty, unique=False):
+        if unique:
+            # Each grid of the pair is dug to a unique solution of its own;
+            # the solver only runs when no naked or hidden single forces the digit
+            digger = UniqueDigger(grid, 3, 3)
+            digger.dig(difficulty, self.rng)
+            for i in range(9):
+                grid[i][:] = digger.puzzle[i]
+            return
+        
         cells = [(i, j) for i in range(9) for j in range(9)]
-        random.shuffle(cells)
+        self.rng.shuffle(cells)
         
         for _ in range(difficulty):
             if cells:
                 row, col = cells.pop()
                 grid[row][col] = 0
     
-    def generate_linked_puzzles(self, difficulty="medium"):
+    def generate_linked_puzzles(self, difficulty="medium", unique=False):
         # Generate first complete puzzle
         self.grid = [[0]*9 for _ in range(9)]
         self.fill_grid()
@@ -66,6 +82,8 @@ class SudokuGenerator:
         self.fill_grid()
         second_complete = [row[:] for row in self.grid]
         
+        self.solution = (first_complete, second_complete)
+        
         # Create puzzle versions by removing numbers
         first_puzzle = [row[:] for row in first_complete]
         second_puzzle = [row[:] for row in second_complete]
@@ -78,8 +96,8 @@ class SudokuGenerator:
         }
         remove_count = difficulty_levels.get(difficulty.lower(), 45)
         
-        self.remove_numbers_from_grid(first_puzzle, remove_count)
-        self.remove_numbers_from_grid(second_puzzle, remove_count)
+        self.remove_numbers_from_grid(first_puzzle, remove_count, unique)
+        self.remove_numbers_from_grid(second_puzzle, remove_count, unique)
         
         return first_puzzle, second_puzzle
 
@@ -90,23 +108,21 @@ def draw_sudoku_grid(c, puzzle, start_x, start_y, title):
         c.setFont("Helvetica-Bold", 12)
         c.drawString(start_x, start_y + 20, title)
     
-    for i in range(10):
-        line_width = 2 if i % 3 == 0 else 1
-        c.setLineWidth(line_width)
-        c.line(start_x + i * cell_size, start_y, 
-               start_x + i * cell_size, start_y - 9 * cell_size)
-        c.line(start_x, start_y - i * cell_size,
-               start_x + 9 * cell_size, start_y - i * cell_size)
+    pdf_grids.grid(c, start_x, start_y, 9, 3, 3, cell_size)
     
-    c.setFont("Helvetica", 9)  # Reduced font size from 10 to 9
+    clues = []
     for i in range(9):
         for j in range(9):
             if puzzle[i][j] != 0:
                 x = start_x + j * cell_size + cell_size/2 - 3
                 y = start_y - i * cell_size - cell_size/2 - 3
-                c.drawString(x, y, str(puzzle[i][j]))
+                clues.append((x, y, str(puzzle[i][j])))
+    pdf_grids.draw_clues(c, "Helvetica", 9, clues)  # Reduced font size from 10 to 9
 
 def create_pdf_with_linked_sudoku(puzzle_pairs, difficulty, filename):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    
     c = canvas.Canvas(filename, pagesize=letter)
     width, height = letter
     
@@ -172,14 +188,21 @@ def main():
     # CHANGE NUMBER OF PUZZLE PAIRS TO GENERATE
     NUM_PUZZLE_PAIRS = 12
     
+    # CHANGE NUMBER OF WORKER PROCESSES (1 = one after another here)
+    WORKERS = 1
+    
     generator = SudokuGenerator()
     puzzle_pairs = []
     
     print(f"Generating {NUM_PUZZLE_PAIRS} {DIFFICULTY} linked Sudoku puzzle pairs...")
-    for i in range(NUM_PUZZLE_PAIRS):
-        puzzle1, puzzle2 = generator.generate_linked_puzzles(DIFFICULTY)
-        puzzle_pairs.append((puzzle1, puzzle2))
-        print(f"Linked pair {i+1} generated")
+    if WORKERS > 1:
+        from sudoku_generators import parallel
+        puzzle_pairs = parallel.generate("double_linked", NUM_PUZZLE_PAIRS, DIFFICULTY, workers=WORKERS)
+    else:
+        for i in range(NUM_PUZZLE_PAIRS):
+            puzzle1, puzzle2 = generator.generate_linked_puzzles(DIFFICULTY)
+            puzzle_pairs.append((puzzle1, puzzle2))
+            print(f"Linked pair {i+1} generated")
     
     filename = f"{DIFFICULTY}_linked_sudoku_puzzles.pdf"
     create_pdf_with_linked_sudoku(puzzle_pairs, DIFFICULTY, filename)
@@ -1,10 +1,28 @@
+import os
 import random
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+import sys
+
+# Make the shared sudoku_generators package importable when run as a script
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from sudoku_generators import pdf_grids, search
+from sudoku_generators.constraints import CandidateGrid
+from sudoku_generators.digging import UniqueDigger
 
 class SamuraiSudokuGenerator:
-    def __init__(self):
+    def __init__(self, fill_mode="iterative", seed=None, rng=None):
         self.grid = [[0]*9 for _ in range(9)]
+        self.constraints = CandidateGrid(9, 3, 3)
+        self.fill_mode = fill_mode
+        # Every random choice goes through self.rng; pass a random.Random
+        # or a seed to make the puzzles repeatable
+        if rng is None:
+            rng = random.Random(seed) if seed is not None else random
+        self.rng = rng
+        # Complete grids behind the last puzzle returned
+        self.solution = None
     
     def is_valid(self, row, col, num):
         for x in range(9):
@@ -19,30 +37,29 @@ class SamuraiSudokuGenerator:
         return True
     
     def fill_grid(self):
-        for i in range(9):
-            for j in range(9):
-                if self.grid[i][j] == 0:
-                    numbers = list(range(1, 10))
-                    random.shuffle(numbers)
-                    for num in numbers:
-                        if self.is_valid(i, j, num):
-                            self.grid[i][j] = num
-                            if self.fill_grid():
-                                return True
-                            self.grid[i][j] = 0
-                    return False
-        return True
-    
-    def remove_numbers_from_grid(self, grid, difficulty):
+        # Presets from the shared blocks are picked up by search.fill; the
+        # default "iterative" filler avoids one Python frame per cell
+        return search.fill(self.grid, self.constraints, self.fill_mode, self.rng)
+    
+    def remove_numbers_from_grid(self, grid, difficulty, unique=False):
+        if unique:
+            # Keep this 9x9 uniquely solvable without help from the shared
+            # corners; blanking a digit the other clues force skips the solver
+            digger = UniqueDigger(grid, 3, 3)
+            digger.dig(difficulty, self.rng)
+            for i in range(9):
+                grid[i][:] = digger.puzzle[i]
+            return
+        
         cells = [(i, j) for i in range(9) for j in range(9)]
-        random.shuffle(cells)
+        self.rng.shuffle(cells)
         
         for _ in range(difficulty):
             if cells:
                 row, col = cells.pop()
                 grid[row][col] = 0
     
-    def generate_samurai_puzzles(self, difficulty="medium"):
+    def generate_samurai_puzzles(self, difficulty="medium", unique=False):
         # Generate center puzzle first
         self.grid = [[0]*9 for _ in range(9)]
         self.fill_grid()
@@ -80,6 +97,9 @@ class SamuraiSudokuGenerator:
             self.fill_grid()
             outer_puzzles[corner_name] = [row[:] for row in self.grid]
         
+        self.solution = (center_complete,
+                         {name: [row[:] for row in grid] for name, grid in outer_puzzles.items()})
+        
         # Create puzzle versions by removing numbers
         center_puzzle = [row[:] for row in center_complete]
         
@@ -90,10 +110,10 @@ class SamuraiSudokuGenerator:
         }
         remove_count = difficulty_levels.get(difficulty.lower(), 45)
         
-        self.remove_numbers_from_grid(center_puzzle, remove_count)
+        self.remove_numbers_from_grid(center_puzzle, remove_count, unique)
         
         for corner_name in outer_puzzles:
-            self.remove_numbers_from_grid(outer_puzzles[corner_name], remove_count)
+            self.remove_numbers_from_grid(outer_puzzles[corner_name], remove_count, unique)
         
         return center_puzzle, outer_puzzles
 
@@ -104,23 +124,21 @@ def draw_sudoku_grid(c, puzzle, start_x, start_y, title):
         c.setFont("Helvetica-Bold", 12)
         c.drawString(start_x, start_y + 25, title)
     
-    for i in range(10):
-        line_width = 2 if i % 3 == 0 else 1
-        c.setLineWidth(line_width)
-        c.line(start_x + i * cell_size, start_y, 
-               start_x + i * cell_size, start_y - 9 * cell_size)
-        c.line(start_x, start_y - i * cell_size,
-               start_x + 9 * cell_size, start_y - i * cell_size)
+    pdf_grids.grid(c, start_x, start_y, 9, 3, 3, cell_size)
     
-    c.setFont("Helvetica", 10)  # Increased font size from 8 to 10
+    clues = []
     for i in range(9):
         for j in range(9):
             if puzzle[i][j] != 0:
                 x = start_x + j * cell_size + cell_size/2 - 3
                 y = start_y - i * cell_size - cell_size/2 - 3
-                c.drawString(x, y, str(puzzle[i][j]))
+                clues.append((x, y, str(puzzle[i][j])))
+    pdf_grids.draw_clues(c, "Helvetica", 10, clues)  # Increased font size from 8 to 10
 
 def create_pdf_with_samurai_sudoku(samurai_puzzles, difficulty, filename):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    
     c = canvas.Canvas(filename, pagesize=letter)
     width, height = letter
     
@@ -200,14 +218,21 @@ def main():
     # CHANGE NUMBER OF PUZZLES TO GENERATE
     NUM_PUZZLES = 20
     
+    # CHANGE NUMBER OF WORKER PROCESSES (1 = one after another here)
+    WORKERS = 1
+    
     generator = SamuraiSudokuGenerator()
     samurai_puzzles = []
     
     print(f"Generating {NUM_PUZZLES} {DIFFICULTY} Samurai Sudoku puzzles...")
-    for i in range(NUM_PUZZLES):
-        center, outers = generator.generate_samurai_puzzles(DIFFICULTY)
-        samurai_puzzles.append((center, outers))
-        print(f"Samurai puzzle {i+1} generated")
+    if WORKERS > 1:
+        from sudoku_generators import parallel
+        samurai_puzzles = parallel.generate("samurai", NUM_PUZZLES, DIFFICULTY, workers=WORKERS)
+    else:
+        for i in range(NUM_PUZZLES):
+            center, outers = generator.generate_samurai_puzzles(DIFFICULTY)
+            samurai_puzzles.append((center, outers))
+            print(f"Samurai puzzle {i+1} generated")
     
     filename = f"{DIFFICULTY}_samurai_sudoku_puzzles.pdf"
     create_pdf_with_samurai_sudoku(samurai_puzzles, DIFFICULTY, filename)
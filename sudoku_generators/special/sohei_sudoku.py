@@ -1,10 +1,27 @@
+import os
 import random
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+import sys
+
+# Make the shared sudoku_generators package importable when run as a script
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from sudoku_generators import pdf_grids, search
+from sudoku_generators.constraints import CandidateGrid
 
 class SoheiSudokuGenerator:
-    def __init__(self):
+    def __init__(self, fill_mode="iterative", seed=None, rng=None):
         self.grid = [[0]*9 for _ in range(9)]
+        self.constraints = CandidateGrid(9, 3, 3)
+        self.fill_mode = fill_mode
+        # Every random choice goes through self.rng; pass a random.Random
+        # or a seed to make the puzzles repeatable
+        if rng is None:
+            rng = random.Random(seed) if seed is not None else random
+        self.rng = rng
+        # Complete grids behind the last puzzle returned
+        self.solution = None
     
     def is_valid(self, row, col, num):
         for x in range(9):
@@ -19,19 +36,9 @@ class SoheiSudokuGenerator:
         return True
     
     def fill_grid(self):
-        for i in range(9):
-            for j in range(9):
-                if self.grid[i][j] == 0:
-                    numbers = list(range(1, 10))
-                    random.shuffle(numbers)
-                    for num in numbers:
-                        if self.is_valid(i, j, num):
-                            self.grid[i][j] = num
-                            if self.fill_grid():
-                                return True
-                            self.grid[i][j] = 0
-                    return False
-        return True
+        # Presets from the shared blocks are picked up by search.fill; the
+        # default "iterative" filler avoids one Python frame per cell
+        return search.fill(self.grid, self.constraints, self.fill_mode, self.rng)
     
     def generate_sohei_puzzle(self, difficulty="medium"):
         # Generate 4 complete independent puzzles first
@@ -76,6 +83,8 @@ class SoheiSudokuGenerator:
             'bottom': bottom_puzzle
         }
         
+        self.solution = {name: [row[:] for row in grid] for name, grid in puzzles.items()}
+        
         # Remove numbers for difficulty
         difficulty_levels = {
             "easy": 35,
@@ -86,7 +95,7 @@ class SoheiSudokuGenerator:
         
         for puzzle in puzzles.values():
             cells = [(i, j) for i in range(9) for j in range(9)]
-            random.shuffle(cells)
+            self.rng.shuffle(cells)
             for _ in range(remove_count):
                 if cells:
                     row, col = cells.pop()
@@ -95,23 +104,18 @@ class SoheiSudokuGenerator:
         return puzzles
 
 def draw_single_sudoku(c, puzzle, start_x, start_y, cell_size):
-    # Draw grid lines
-    for i in range(10):
-        line_width = 2 if i % 3 == 0 else 1
-        c.setLineWidth(line_width)
-        c.line(start_x + i * cell_size, start_y, 
-               start_x + i * cell_size, start_y - 9 * cell_size)
-        c.line(start_x, start_y - i * cell_size,
-               start_x + 9 * cell_size, start_y - i * cell_size)
-    
-    # Fill numbers
-    c.setFont("Helvetica", 8)  # Reduced font size for two per page
+    # Draw grid lines (one form per document and cell size)
+    pdf_grids.grid(c, start_x, start_y, 9, 3, 3, cell_size)
+    
+    # Fill numbers (one text object per grid)
+    clues = []
     for i in range(9):
         for j in range(9):
             if puzzle[i][j] != 0:
                 x = start_x + j * cell_size + cell_size/2 - 2
                 y = start_y - i * cell_size - cell_size/2 - 2
-                c.drawString(x, y, str(puzzle[i][j]))
+                clues.append((x, y, str(puzzle[i][j])))
+    pdf_grids.draw_clues(c, "Helvetica", 8, clues)  # Reduced font size for two per page
 
 def draw_sohei_cross(c, puzzles, start_x, start_y, cell_size):
     # Calculate positions for cross layout
@@ -138,6 +142,9 @@ def draw_sohei_cross(c, puzzles, start_x, start_y, cell_size):
     draw_single_sudoku(c, puzzles['bottom'], bottom_x, bottom_y, cell_size)
 
 def create_pdf_with_sohei_sudoku(sohei_puzzles, difficulty, filename):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    
     c = canvas.Canvas(filename, pagesize=letter)
     width, height = letter
     
@@ -192,14 +199,21 @@ def main():
     # CHANGE NUMBER OF PUZZLES TO GENERATE
     NUM_PUZZLES = 12
     
+    # CHANGE NUMBER OF WORKER PROCESSES (1 = one after another here)
+    WORKERS = 1
+    
     generator = SoheiSudokuGenerator()
     sohei_puzzles = []
     
     print(f"Generating {NUM_PUZZLES} {DIFFICULTY} Sohei Sudoku puzzles...")
-    for i in range(NUM_PUZZLES):
-        puzzles = generator.generate_sohei_puzzle(DIFFICULTY)
-        sohei_puzzles.append(puzzles)
-        print(f"Sohei puzzle {i+1} generated")
+    if WORKERS > 1:
+        from sudoku_generators import parallel
+        sohei_puzzles = parallel.generate("sohei", NUM_PUZZLES, DIFFICULTY, workers=WORKERS)
+    else:
+        for i in range(NUM_PUZZLES):
+            puzzles = generator.generate_sohei_puzzle(DIFFICULTY)
+            sohei_puzzles.append(puzzles)
+            print(f"Sohei puzzle {i+1} generated")
     
     filename = f"{DIFFICULTY}_sohei_sudoku_puzzles.pdf"
     print(f"Creating PDF: {filename}")
@@ -0,0 +1,38 @@
+"""Validity-preserving transforms of complete sudoku grids.
+
+Any solved grid can be turned into another solved grid of the same box
+shape by relabeling digits, permuting rows inside a band (a horizontal
+strip of boxes), columns inside a stack (a vertical strip of boxes), the
+bands and stacks themselves, and transposing when the boxes are square.
+"""
+import random
+
+
+def band_order(count, band_size, rng=random):
+    # Shuffle the bands, then the lines inside each band
+    bands = list(range(count // band_size))
+    rng.shuffle(bands)
+    order = []
+    for band in bands:
+        lines = list(range(band * band_size, (band + 1) * band_size))
+        rng.shuffle(lines)
+        order.extend(lines)
+    return order
+
+
+def transform_solution(grid, box_rows, box_cols, rng=random):
+    size = len(grid)
+
+    digits = list(range(1, size + 1))
+    rng.shuffle(digits)
+    relabel = [0] + digits
+
+    row_order = band_order(size, box_rows, rng)
+    col_order = band_order(size, box_cols, rng)
+
+    result = [[relabel[grid[r][c]] for c in col_order] for r in row_order]
+
+    # Transposing swaps the box shape, so only square boxes allow it
+    if box_rows == box_cols and rng.random() < 0.5:
+        result = [list(col) for col in zip(*result)]
+    return result